@@ -16,19 +16,30 @@
 import argparse
 import asyncio
 import csv
+import functools
+import io
+import heapq
 import json
+import math
+import mmap
+import operator
 import os
 import platform
 import re
+import selectors
+import shutil
 import signal
 import socket
+import struct
+import tempfile
 import webbrowser
 import sys
 import threading
 import time
+from array import array
 from collections import deque
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 try:
     from bleak import BleakScanner
@@ -55,12 +66,26 @@ except ImportError:
 
 _HAS_FLASK = False
 try:
-    from flask import Flask, render_template_string, jsonify
+    from flask import Flask, render_template_string
     from flask_socketio import SocketIO
     _HAS_FLASK = True
 except ImportError:
     pass
 
+_HAS_ORJSON = False
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    pass
+
+_HAS_UVLOOP = False
+try:
+    import uvloop
+    _HAS_UVLOOP = True
+except ImportError:
+    pass
+
 # Environment path loss exponents for distance estimation
 _ENV_PATH_LOSS = {
     "free_space": 2.0,
@@ -68,6 +93,13 @@ _ENV_PATH_LOSS = {
     "indoor": 3.0,
 }
 
+# Path-loss distance for every integer dB difference in [-128, 127], per
+# environment — _estimate_distance() indexes these instead of calling pow()
+_DIST_LUT = {
+    env: array("d", (10 ** (delta / (10 * n)) for delta in range(-128, 128)))
+    for env, n in _ENV_PATH_LOSS.items()
+}
+
 # Default reference-RSSI offset (dB) subtracted from TX Power to estimate
 # the expected RSSI at the 1-metre reference distance.  The theoretical
 # free-space path loss at 1 m for 2.4 GHz is ~41 dB, but real BLE devices
@@ -76,6 +108,9 @@ _ENV_PATH_LOSS = {
 # which corresponds to an offset of 59.
 _DEFAULT_REF_OFFSET = 59
 
+# Host OS ("Linux", "Darwin", "Windows"), looked up once at import
+_PLATFORM = platform.system()
+
 # Polling / timing constants
 _TUI_REFRESH_INTERVAL = 0.3       # seconds between TUI redraws
 _SCAN_POLL_INTERVAL = 0.5         # seconds between poll cycles (continuous)
@@ -83,6 +118,14 @@ _TIMED_SCAN_POLL_INTERVAL = 0.1   # seconds between poll cycles (timed)
 _GPS_RECONNECT_DELAY = 5          # seconds before GPS reconnect attempt
 _GPS_SOCKET_TIMEOUT = 5           # seconds for GPS socket operations
 _GPS_STARTUP_DELAY = 0.5          # seconds to wait for initial GPS connection
+_GPS_READ_BUFFER = 8192           # max bytes per gpsd socket recv()
+_LOG_BATCH_ROWS = 64              # live-log rows buffered before a write
+_LOG_FLUSH_INTERVAL = 0.5         # max seconds a live-log row stays buffered
+_WARN_BLOOM_BYTES = 1 << 16       # UUID-warning Bloom filter size (512 Ki bits)
+_WARN_RECENT_MAX = 1024           # warned UUIDs kept to confirm Bloom hits
+_OUTPUT_BUFFER = 1 << 20          # bytes buffered per output/log file handle
+_SUMMARY_TOP = 50                 # devices listed in the end-of-scan summary
+_IRK_CACHE_MAX = 4096             # addresses whose IRK match result is kept
 
 _FIELDNAMES = [
     "timestamp", "address", "name", "rssi", "avg_rssi", "tx_power",
@@ -90,6 +133,135 @@ _FIELDNAMES = [
     "manufacturer_data", "service_uuids", "resolved",
 ]
 
+
+class Record:
+    """One detection; fields follow _FIELDNAMES, missing values are "".
+
+    manufacturer_data and service_uuids may be given as the raw
+    advertisement dict / list; they are only formatted to strings when
+    first read, so scans with no output, log or GUI never format them.
+    """
+
+    __slots__ = tuple(f for f in _FIELDNAMES
+                      if f not in ("manufacturer_data", "service_uuids")
+                      ) + ("_mfr", "_uuids")
+
+    def __init__(self, timestamp, address, name, rssi, avg_rssi, tx_power,
+                 est_distance, latitude, longitude, gps_altitude,
+                 manufacturer_data, service_uuids, resolved):
+        self.timestamp = timestamp
+        self.address = address
+        self.name = name
+        self.rssi = rssi
+        self.avg_rssi = avg_rssi
+        self.tx_power = tx_power
+        self.est_distance = est_distance
+        self.latitude = latitude
+        self.longitude = longitude
+        self.gps_altitude = gps_altitude
+        self._mfr = manufacturer_data
+        self._uuids = service_uuids
+        self.resolved = resolved
+
+    @property
+    def manufacturer_data(self) -> str:
+        value = self._mfr
+        if value.__class__ is not str:
+            value = self._mfr = _format_mfr(value)
+        return value
+
+    @manufacturer_data.setter
+    def manufacturer_data(self, value):
+        self._mfr = value
+
+    @property
+    def service_uuids(self) -> str:
+        value = self._uuids
+        if value.__class__ is not str:
+            value = self._uuids = ", ".join(value) if value else ""
+        return value
+
+    @service_uuids.setter
+    def service_uuids(self, value):
+        self._uuids = value
+
+    def as_dict(self) -> dict:
+        """Return the record as a dict for JSON export."""
+        return dict(zip(_FIELDNAMES, _record_row(self)))
+
+
+class TuiDevice:
+    """Live-table entry for one device, updated in place per advertisement.
+
+    last_seen is epoch seconds; it is only formatted for the rows drawn.
+    """
+
+    __slots__ = ("address", "name", "rssi", "avg_rssi", "est_distance",
+                 "times_seen", "last_seen", "resolved")
+
+    def __init__(self, address: str):
+        self.address = address
+        self.name = "Unknown"
+        self.rssi = 0
+        self.avg_rssi: Optional[int] = None
+        self.est_distance = ""
+        self.times_seen = 0
+        self.last_seen = 0.0
+        self.resolved: Optional[bool] = None
+
+
+# Record -> CSV row values in _FIELDNAMES order
+_record_row = operator.attrgetter(*_FIELDNAMES)
+# TUI device entry -> sort key for the live table
+_tui_rssi = operator.attrgetter("rssi")
+# (address, count) -> sort key for the summary tables
+_count_key = operator.itemgetter(1)
+
+# Fixed table headers: (heading, rule) for the summary, and the TUI columns
+_SUMMARY_RESOLVED_HDR = (f"  {'Address':<20} {'Detections':>11}",
+                         f"  {'—'*20} {'—'*11}")
+_SUMMARY_RESOLVED_HDR_GPS = (f"  {'Address':<20} {'Detections':>11}  {'Best GPS'}",
+                             f"  {'—'*20} {'—'*11}  {'—'*24}")
+_SUMMARY_DEVICES_HDR = (f"\n  {'Address':<40} {'Seen':>6}",
+                        f"  {'—'*40} {'—'*6}")
+_SUMMARY_DEVICES_HDR_GPS = (f"\n  {'Address':<40} {'Seen':>6}  {'Best GPS'}",
+                            f"  {'—'*40} {'—'*6}  {'—'*24}")
+_TUI_COL_FMT = " {:<19s} {:<16s} {:>5s} {:>5s} {:>7s} {:>5s} {:>8s}"
+_TUI_COL_HDR = _TUI_COL_FMT.format(
+    "Address", "Name", "RSSI", "Avg", "Dist", "Seen", "Last")
+# company ID -> "0x004C:" prefix for manufacturer_data strings
+_MFR_PREFIX: Dict[int, str] = {}
+
+
+def _format_mfr(manufacturer_data: Optional[Dict[int, bytes]]) -> str:
+    """Format advertisement manufacturer data as "0x004C:0215; ..."."""
+    if not manufacturer_data:
+        return ""
+    prefixes = _MFR_PREFIX
+    parts = []
+    for mfr_id, data in manufacturer_data.items():
+        prefix = prefixes.get(mfr_id)
+        if prefix is None:
+            prefix = prefixes[mfr_id] = f"0x{mfr_id:04X}:"
+        parts.append(prefix + data.hex())
+    return "; ".join(parts)
+
+
+# Binary live log (--log-format binary).  The file starts with _BIN_MAGIC;
+# each record is _BIN_RECORD (epoch second and UTC offset of the record's
+# timestamp, rssi, avg_rssi, tx_power, est_distance, lat, lon, alt,
+# resolved, address kind, then the byte lengths of the four strings)
+# followed by the address, name, manufacturer data and service UUIDs as
+# UTF-8.  An upper-case MAC address is stored as its 6 raw bytes
+# (_BIN_ADDR_MAC); anything else is kept as text (_BIN_ADDR_TEXT).
+# Missing integers are _BIN_NO_INT, missing floats are NaN, resolved is
+# 0/1/2 for False/True/unknown.
+_BIN_MAGIC = b"BTRPALOG\x03"
+_BIN_RECORD = struct.Struct("<qihhhddddBBBBHH")
+_BIN_NO_INT = -32768
+_BIN_ADDR_TEXT = 0
+_BIN_ADDR_MAC = 1
+
 _BANNER = r"""
   _     _
  | |__ | |_ _ __ _ __   __ _       ___  ___ __ _ _ __
@@ -293,6 +465,7 @@ body::after{content:"";position:fixed;inset:0;z-index:9998;pointer-events:none;
   <span class="stat"><b id="s-unique">0</b> devices</span>
   <span class="stat"><b id="s-total">0</b> detections</span>
   <span class="stat"><b id="s-elapsed">00:00</b> elapsed</span>
+  <span class="stat" id="s-link" style="color:var(--red);display:none">[DISCONNECTED]</span>
   <span class="stat" id="sound-toggle" style="cursor:pointer;color:var(--dim);user-select:none" title="Toggle audio pings">[SND:OFF]</span>
   <div class="meta" id="s-meta"></div>
 </div>
@@ -466,8 +639,31 @@ function getMatrixChar(col){
   return "0123456789ABCDEF"[Math.floor(Math.random()*16)];
 }
 
+// character -> small offscreen canvas with the glyph in solid green.
+// drawImage() from these is far cheaper than fillText() for every column
+// on every frame; the pool can hold any character, so glyphs are
+// rendered on first use and the cache is reset if it grows large.
+var matrixGlyphs = new Map();
+var MATRIX_GLYPH_H = Math.ceil(MATRIX_FONT_SIZE*1.3);
+function matrixGlyph(ch){
+  var g = matrixGlyphs.get(ch);
+  if(!g){
+    if(matrixGlyphs.size >= 256) matrixGlyphs.clear();
+    g = document.createElement("canvas");
+    g.width = MATRIX_FONT_SIZE;
+    g.height = MATRIX_GLYPH_H;
+    var gc = g.getContext("2d");
+    gc.font = MATRIX_FONT_SIZE+"px monospace";
+    gc.fillStyle = "rgb(0,255,65)";
+    gc.fillText(ch, 0, MATRIX_FONT_SIZE);
+    matrixGlyphs.set(ch, g);
+  }
+  return g;
+}
+
 var matrixFrameCount = 0;
 function drawMatrix(){
+  if(document.hidden) return;
   matrixFrameCount++;
   // full clear every ~30s (600 frames at 20fps) to prevent green haze buildup
   if(matrixFrameCount % 600 === 0){
@@ -477,18 +673,17 @@ function drawMatrix(){
     mCtx.fillStyle = "rgba(10,10,10,0.08)";
     mCtx.fillRect(0,0,mCanvas.width,mCanvas.height);
   }
-  mCtx.font = MATRIX_FONT_SIZE+"px monospace";
   for(var i=0;i<matrixW;i++){
     var x = i * MATRIX_FONT_SIZE;
     var y = matrixCols[i];
-    var ch = getMatrixChar(i);
-    // head character brighter
-    mCtx.fillStyle = "rgba(0,255,65,0.25)";
-    mCtx.fillText(ch, x, y);
+    var g = matrixGlyph(getMatrixChar(i));
+    // head character brighter (glyph baseline sits at MATRIX_FONT_SIZE)
+    mCtx.globalAlpha = 0.25;
+    mCtx.drawImage(g, x, y - MATRIX_FONT_SIZE);
     // trail character dimmer
     if(y > MATRIX_FONT_SIZE){
-      mCtx.fillStyle = "rgba(0,255,65,0.06)";
-      mCtx.fillText(ch, x, y - MATRIX_FONT_SIZE);
+      mCtx.globalAlpha = 0.06;
+      mCtx.drawImage(g, x, y - 2*MATRIX_FONT_SIZE);
     }
     matrixCols[i] += MATRIX_FONT_SIZE;
     // reset column randomly or when off screen
@@ -496,6 +691,7 @@ function drawMatrix(){
       matrixCols[i] = 0;
     }
   }
+  mCtx.globalAlpha = 1;
 }
 // update matrix pool every 5s with real device data
 setInterval(feedMatrixPool, 5000);
@@ -578,6 +774,19 @@ function hashAddr2(addr){
   for(var i=0;i<addr.length;i++){h=((h<<5)+h)^addr.charCodeAt(i);h|=0;}
   return h<0?-h:h;
 }
+// address -> {angle, jitter}; the hashes never change for an address, so
+// they are computed once rather than for every device on every frame
+var radarSlots = {};
+function radarSlot(addr){
+  var s = radarSlots[addr];
+  if(!s){
+    s = radarSlots[addr] = {
+      angle: (hashAddr(addr)%3600)/3600*Math.PI*2,
+      jitter: ((hashAddr2(addr)%100)-50)/50
+    };
+  }
+  return s;
+}
 
 function distToRadius(d, maxR){
   if(d==null||d===""||d<=0) return maxR*0.85;
@@ -857,11 +1066,12 @@ function drawRadar(ts){
   var addrs = Object.keys(devices);
   for(var i=0;i<addrs.length;i++){
     var dev = devices[addrs[i]];
-    var angle = (hashAddr(dev.address)%3600)/3600*Math.PI*2;
+    var slot = radarSlot(dev.address);
+    var angle = slot.angle;
     var dist = dev.est_distance;
     var r2 = distToRadius(dist, maxR);
     // small radius jitter to separate colliding dots
-    var jitter = ((hashAddr2(dev.address)%100)-50)/50 * 8 * dpr;
+    var jitter = slot.jitter * 8 * dpr;
     r2 = Math.max(4*dpr, Math.min(r2 + jitter, maxR));
     var dx = cx + Math.cos(angle)*r2;
     var dy = cy + Math.sin(angle)*r2;
@@ -921,12 +1131,14 @@ function drawRadar(ts){
   rCtx.fillText("DEVICES: "+devCount, co+4*dpr, co+cb+14*dpr);
   rCtx.fillText("RANGE: "+MAX_RING+"m", W-co-70*dpr, co+cb+14*dpr);
 
-  requestAnimationFrame(drawRadar);
+  // stop animating while the tab is hidden; visibilitychange restarts it
+  if(document.hidden) radarStopped = true;
+  else requestAnimationFrame(drawRadar);
 }
 
 // spawn a ping ripple when a new device is detected or updated
 function spawnPing(dev, cx, cy, maxR){
-  var angle = (hashAddr(dev.address)%3600)/3600*Math.PI*2;
+  var angle = radarSlot(dev.address).angle;
   var dist = dev.est_distance;
   var r2 = distToRadius(dist, maxR);
   var dpr = window.devicePixelRatio||1;
@@ -939,6 +1151,13 @@ function spawnPing(dev, cx, cy, maxR){
   });
 }
 
+var radarStopped = false;
+document.addEventListener("visibilitychange", function(){
+  if(!document.hidden && radarStopped){
+    radarStopped = false;
+    requestAnimationFrame(drawRadar);
+  }
+});
 requestAnimationFrame(drawRadar);
 
 /* ── radar hit test for tooltip ─────────────────────────── */
@@ -1030,7 +1249,7 @@ var dlScroll = document.getElementById("dl-scroll");
 var dlEntries = {}; // address -> DOM element
 var STALE_TIMEOUT = 600000; // 10 minutes — prune devices not seen for this long
 var dlPendingUpdate = false;
-var dlLastOrder = ""; // track sort order to avoid unnecessary reorder
+var dlDirty = new Set(); // addresses whose list entry needs refreshing
 
 function sigClass(d){
   var dist = d.est_distance;
@@ -1149,6 +1368,7 @@ function pruneStaleDevices(){
     var d = devices[addr];
     if(now - (d._updateTs||0) > STALE_TIMEOUT && !pinnedAddrs[addr]){
       delete devices[addr];
+      delete radarSlots[addr];
       // remove DOM entry
       if(dlEntries[addr]){
         if(dlEntries[addr].parentNode) dlEntries[addr].parentNode.removeChild(dlEntries[addr]);
@@ -1165,6 +1385,29 @@ function pruneStaleDevices(){
 // run prune every 30s
 setInterval(function(){ pruneStaleDevices(); updateDeviceListNow(); }, 30000);
 
+// map markers and the pinned panel are redrawn at most once per animation
+// frame, however many device updates arrive in between
+var renderDirty = new Set();
+var renderPinned = false;
+var renderRaf = 0;
+function scheduleRender(addr, pinned){
+  renderDirty.add(addr);
+  if(pinned) renderPinned = true;
+  if(!renderRaf) renderRaf = requestAnimationFrame(flushRender);
+}
+function flushRender(){
+  renderRaf = 0;
+  renderDirty.forEach(function(addr){
+    var d = devices[addr];
+    if(d) updateDevMarker(d);
+  });
+  renderDirty.clear();
+  if(renderPinned){
+    renderPinned = false;
+    updatePinnedPanel();
+  }
+}
+
 function updateDeviceList(){
   // throttle: batch updates, run at most once per 500ms
   if(dlPendingUpdate) return;
@@ -1179,8 +1422,6 @@ function updateDeviceListNow(){
     var vb = b.rssi!=null ? b.rssi : -999;
     return vb - va;
   });
-  // build new order key to check if reorder is needed
-  var orderKey = "";
   for(var i=0;i<list.length;i++){
     var d = list[i];
     var el = dlEntries[d.address];
@@ -1204,32 +1445,39 @@ function updateDeviceListNow(){
       el.addEventListener("mouseleave", function(){
         hoveredAddr=null; hideTooltip();
       });
+      // child elements looked up once, not on every refresh
+      el._addr = el.querySelector(".de-addr");
+      el._name = el.querySelector(".de-name");
+      el._rssi = el.querySelector(".de-rssi");
+      el._dist = el.querySelector(".de-dist");
+      el._pin = el.querySelector(".de-pin");
+      el._bar = el.querySelector(".signal-bar");
       dlEntries[d.address] = el;
+      dlDirty.add(d.address);
     }
-    el.querySelector(".de-addr").textContent = d.address;
-    el.querySelector(".de-name").textContent = d.name&&d.name!=="Unknown" ? d.name : "";
-    var rssiEl = el.querySelector(".de-rssi");
-    rssiEl.textContent = d.rssi!=null ? d.rssi+" dBm" : "";
-    rssiEl.style.color = colorFromRssiOrDist(d);
+    // only entries whose device changed since the last render are rewritten
+    if(!dlDirty.has(d.address)) continue;
+    el._addr.textContent = d.address;
+    el._name.textContent = d.name&&d.name!=="Unknown" ? d.name : "";
+    el._rssi.textContent = d.rssi!=null ? d.rssi+" dBm" : "";
+    el._rssi.style.color = colorFromRssiOrDist(d);
     var distVal = d.est_distance;
     var distStr = (distVal!=null&&distVal!==""&&!isNaN(distVal)) ? "~"+Number(distVal).toFixed(1)+"m" : "";
-    el.querySelector(".de-dist").textContent = distStr;
-    el.querySelector(".de-pin").textContent = pinnedAddrs[d.address] ? " [pinned]" : "";
+    el._dist.textContent = distStr;
+    el._pin.textContent = pinnedAddrs[d.address] ? " [pinned]" : "";
     // signal bar: width proportional to RSSI (-100=0%, -30=100%)
-    var bar = el.querySelector(".signal-bar");
     var pct = d.rssi!=null ? Math.max(0,Math.min(100,((d.rssi+100)/70)*100)) : 0;
-    bar.style.width = pct + "%";
-    bar.className = "signal-bar " + sigBarColor(d);
+    el._bar.style.width = pct + "%";
+    el._bar.className = "signal-bar " + sigBarColor(d);
     el.className = "dev-entry " + sigClass(d) + (pinnedAddrs[d.address] ? " pinned" : "");
-    if(!el.parentNode) dlScroll.appendChild(el);
-    orderKey += d.address + ",";
   }
-  // only reorder DOM if sort order changed
-  if(orderKey !== dlLastOrder){
-    dlLastOrder = orderKey;
-    for(var j=0;j<list.length;j++){
-      dlScroll.appendChild(dlEntries[list[j].address]);
-    }
+  dlDirty.clear();
+  // walk the current children and move only entries that are out of place
+  var node = dlScroll.firstChild;
+  for(var j=0;j<list.length;j++){
+    var want = dlEntries[list[j].address];
+    if(want === node) node = node.nextSibling;
+    else dlScroll.insertBefore(want, node);
   }
   document.querySelector("#device-list .dl-header").textContent = "Detected ("+list.length+")";
 }
@@ -1246,6 +1494,7 @@ function togglePin(addr){
     if(d && d.rssi!=null) recordRssi(addr, d.rssi);
     addLogEntry("PIN", "Tracking "+addr);
   }
+  dlDirty.add(addr);
   updateDeviceList();
   updatePinnedPanel();
 }
@@ -1347,8 +1596,7 @@ function updatePinnedPanel(){
 /* ================================================================
    Tooltip
    ================================================================ */
-function showTooltip(dev, x, y){
-  var tip = document.getElementById("tooltip");
+function buildTooltipHTML(dev){
   var html = "";
   html += '<span class="lbl">Address:</span> <span class="val">'+esc(dev.address)+'</span><br>';
   html += '<span class="lbl">Name:</span> <span class="val">'+esc(dev.name||"Unknown")+'</span><br>';
@@ -1368,7 +1616,18 @@ function showTooltip(dev, x, y){
   }
   html += '<span class="lbl">Seen:</span> <span class="val">'+(dev.times_seen||0)+'x</span>';
   if(dev.resolved===true) html += '<br><span class="val" style="color:var(--green)">IRK RESOLVED</span>';
-  tip.innerHTML = html;
+  return html;
+}
+
+function showTooltip(dev, x, y){
+  var tip = document.getElementById("tooltip");
+  // built once per device update (cleared in applyDeviceUpdate), and only
+  // written to the DOM when it differs from what is already shown
+  var html = dev._tipHTML || (dev._tipHTML = buildTooltipHTML(dev));
+  if(tip._html !== html){
+    tip.innerHTML = html;
+    tip._html = html;
+  }
   tip.style.display = "block";
   positionTooltip(tip, x, y);
 }
@@ -1388,21 +1647,36 @@ function hideTooltip(){
   document.getElementById("tooltip").style.display="none";
 }
 
-function esc(s){ if(!s) return ""; var d=document.createElement("div"); d.textContent=s; return d.innerHTML; }
+var ESC_MAP = {"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#39;"};
+function escChar(c){ return ESC_MAP[c]; }
+function esc(s){ if(!s) return ""; return String(s).replace(/[&<>"']/g, escChar); }
 
 /* ================================================================
    Header / Status
    ================================================================ */
+// status nodes looked up once; each is only written when its text changes
+var statusNodes = {
+  unique: document.getElementById("s-unique"),
+  total: document.getElementById("s-total"),
+  elapsed: document.getElementById("s-elapsed"),
+  dot: document.getElementById("s-dot")
+};
+var statusShown = {};
+function setStatus(key, value){
+  if(statusShown[key] === value) return;
+  statusShown[key] = value;
+  if(key === "dot") statusNodes.dot.style.color = value;
+  else statusNodes[key].textContent = value;
+}
+
 function updateStatus(data){
-  if(data.unique_count!=null) document.getElementById("s-unique").textContent = data.unique_count;
-  if(data.total_detections!=null) document.getElementById("s-total").textContent = data.total_detections;
+  if(data.unique_count!=null) setStatus("unique", String(data.unique_count));
+  if(data.total_detections!=null) setStatus("total", String(data.total_detections));
   if(data.elapsed!=null){
     var m = Math.floor(data.elapsed/60), s = Math.floor(data.elapsed%60);
-    document.getElementById("s-elapsed").textContent = (m<10?"0":"")+m+":"+(s<10?"0":"")+s;
+    setStatus("elapsed", (m<10?"0":"")+m+":"+(s<10?"0":"")+s);
   }
-  var dot = document.getElementById("s-dot");
-  if(data.scanning===false){ dot.style.color="var(--red)"; }
-  else { dot.style.color="var(--green)"; }
+  setStatus("dot", data.scanning===false ? "var(--red)" : "var(--green)");
 }
 
 /* ================================================================
@@ -1496,9 +1770,18 @@ function showOverlay(data){
 /* ================================================================
    Socket.IO
    ================================================================ */
-var socket = io(window.location.protocol+"//"+window.location.hostname+":"+WSPORT, {transports:["websocket","polling"]});
+// websocket only: no long-polling fallback, and a short capped backoff
+// so a restarted scanner is picked up quickly
+var socket = io(window.location.protocol+"//"+window.location.hostname+":"+WSPORT,
+  {transports:["websocket"], upgrade:false, reconnectionDelay:200, reconnectionDelayMax:2000});
+var linkNode = document.getElementById("s-link");
+
+socket.on("disconnect", function(){
+  linkNode.style.display = "";
+});
 
 socket.on("connect", function(){
+  linkNode.style.display = "none";
   // fetch full state on connect
   fetch(window.location.protocol+"//"+window.location.hostname+":"+WSPORT+"/api/state").then(function(r){return r.json();}).then(function(state){
     if(state.devices){
@@ -1507,7 +1790,9 @@ socket.on("connect", function(){
         var d = state.devices[addrs[i]];
         d._updateTs = Date.now();
         devices[d.address] = d;
-        updateDevMarker(d);
+        dlDirty.add(d.address);
+        // markers are drawn together in the next animation frame
+        scheduleRender(d.address, false);
       }
       updateDeviceList();
     }
@@ -1526,18 +1811,27 @@ socket.on("connect", function(){
   }).catch(function(){});
 });
 
-socket.on("device_update", function(d){
-  var isNew = !devices[d.address];
+function applyDeviceUpdate(u){
+  // updates carry only changed fields; an unknown device waits for its
+  // next full record
+  var d = devices[u.address];
+  var isNew = !d;
+  if(isNew){
+    if(!u._full) return;
+    d = devices[u.address] = u;
+  } else {
+    Object.assign(d, u);
+    d._tipHTML = null;
+  }
   d._updateTs = Date.now();
-  devices[d.address] = d;
   // track RSSI history for pinned devices
   if(pinnedAddrs[d.address]){
     recordRssi(d.address, d.rssi);
     if(!isNew) playPing("pinned");
   }
-  updateDevMarker(d);
+  scheduleRender(d.address, pinnedAddrs[d.address]);
+  dlDirty.add(d.address);
   updateDeviceList();
-  if(pinnedAddrs[d.address]) updatePinnedPanel();
   // activity log + effects for new devices
   if(isNew){
     var W = rCanvas.width, H = rCanvas.height;
@@ -1552,6 +1846,10 @@ socket.on("device_update", function(d){
   if(d.resolved===true && isNew){
     addLogEntry("IRK", "Resolved RPA "+d.address);
   }
+}
+socket.on("device_update", applyDeviceUpdate);
+socket.on("device_batch", function(arr){
+  for(var i=0;i<arr.length;i++) applyDeviceUpdate(arr[i]);
 });
 
 socket.on("gps_update", function(g){
@@ -1580,9 +1878,23 @@ socket.on("scan_complete", function(data){
 """
 
 
+# [epoch second, formatted timestamp]; characters 11:19 are HH:MM:SS,
+# which the console and GUI slice out instead of calling strftime() again
+_TS_CACHE = [-1, ""]
+
+
 def _timestamp() -> str:
-    """Return an ISO 8601 timestamp with timezone offset."""
-    return datetime.now().astimezone().strftime("%Y-%m-%dT%H:%M:%S%z")
+    """Return an ISO 8601 timestamp with timezone offset.
+
+    The string only changes once per second, so it is formatted once per
+    wall-clock second and reused for every advertisement in between.
+    """
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[1] = time.strftime("%Y-%m-%dT%H:%M:%S%z",
+                                     time.localtime(now))
+        _TS_CACHE[0] = now
+    return _TS_CACHE[1]
 
 
 def _mask_irk(irk_hex: str) -> str:
@@ -1598,31 +1910,46 @@ class GpsdReader:
     def __init__(self, host: str = "localhost", port: int = 2947):
         self._host = host
         self._port = port
-        self._lock = threading.Lock()
-        self._fix: Optional[dict] = None
+        self._lock = threading.Lock()     # guards _sock
+        # (lat, lon, alt) — replaced wholesale by the reader thread, so a
+        # plain attribute read always sees a complete fix
+        self._fix: Optional[Tuple[float, float, Optional[float]]] = None
         self._connected = False
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._sock: Optional[socket.socket] = None
+        # stop() writes to _wake_w so the reader thread leaves select()
+        # at once (a socketpair, since Windows cannot select() on pipes).
+        # The thread closes the pair itself on exit, so a reader still
+        # inside connect() after stop()'s join never sees a closed socket.
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
 
     @property
-    def fix(self) -> Optional[dict]:
-        with self._lock:
-            return dict(self._fix) if self._fix else None
+    def fix(self) -> Optional[Tuple[float, float, Optional[float]]]:
+        """Latest fix as an immutable (lat, lon, alt) tuple, or None."""
+        return self._fix
 
     @property
     def connected(self) -> bool:
-        with self._lock:
-            return self._connected
+        return self._connected
 
     def start(self):
         self._running = True
-        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._thread = threading.Thread(
+            target=self._run, args=(self._wake_r, self._wake_w), daemon=True)
         self._thread.start()
 
     def stop(self):
         self._running = False
-        # Close socket to unblock recv() immediately
+        if self._wake_w is not None:
+            try:
+                self._wake_w.send(b"\0")
+            except OSError:
+                pass
+        # Close socket to abort a connect() still in progress
         with self._lock:
             if self._sock is not None:
                 try:
@@ -1631,63 +1958,105 @@ class GpsdReader:
                     pass
         if self._thread is not None:
             self._thread.join(timeout=2)
+        self._wake_r = self._wake_w = None
 
-    def _run(self):
-        while self._running:
-            try:
-                self._connect_and_read()
-            except (OSError, ConnectionRefusedError, ConnectionResetError):
-                pass
-            with self._lock:
+    def _run(self, wake_r: socket.socket, wake_w: socket.socket):
+        try:
+            while self._running:
+                try:
+                    self._connect_and_read(wake_r)
+                except (OSError, ConnectionRefusedError, ConnectionResetError):
+                    pass
                 self._connected = False
-            if self._running:
-                time.sleep(_GPS_RECONNECT_DELAY)
+                if self._running:
+                    # Sleep until the reconnect delay passes or stop() wakes us
+                    with selectors.DefaultSelector() as sel:
+                        sel.register(wake_r, selectors.EVENT_READ)
+                        sel.select(_GPS_RECONNECT_DELAY)
+        finally:
+            wake_r.close()
+            wake_w.close()
 
-    def _connect_and_read(self):
+    def _connect_and_read(self, wake_r: socket.socket):
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(_GPS_SOCKET_TIMEOUT)
         with self._lock:
             self._sock = sock
         try:
             sock.connect((self._host, self._port))
-            with self._lock:
-                self._connected = True
+            self._connected = True
             sock.sendall(b'?WATCH={"enable":true,"json":true}\n')
-            buf = ""
-            while self._running:
-                try:
-                    data = sock.recv(4096)
-                except socket.timeout:
-                    continue
-                if not data:
-                    break
-                buf += data.decode("utf-8", errors="replace")
-                while "\n" in buf:
-                    line, buf = buf.split("\n", 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        msg = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-                    if msg.get("class") == "TPV":
-                        lat = msg.get("lat")
-                        lon = msg.get("lon")
-                        if lat is not None and lon is not None:
-                            with self._lock:
-                                self._fix = {
-                                    "lat": lat,
-                                    "lon": lon,
-                                    "alt": msg.get("alt"),
-                                }
+            sock.setblocking(False)
+            partial = b""
+            with selectors.DefaultSelector() as sel:
+                sel.register(sock, selectors.EVENT_READ)
+                sel.register(wake_r, selectors.EVENT_READ)
+                while self._running:
+                    events = sel.select()
+                    if not self._running or any(
+                            key.fileobj is wake_r for key, _ in events):
+                        break
+                    # Drain everything gpsd has already queued — only the
+                    # newest fix in a burst is worth parsing
+                    chunks = []
+                    eof = False
+                    while True:
+                        try:
+                            data = sock.recv(_GPS_READ_BUFFER)
+                        except BlockingIOError:
+                            break
+                        if not data:
+                            eof = True
+                            break
+                        chunks.append(data)
+                    if chunks:
+                        lines = (partial + b"".join(chunks)).split(b"\n")
+                        partial = lines.pop()
+                        # Newest first; skip SKY/GST/VERSION without decoding
+                        for raw in reversed(lines):
+                            if b'"TPV"' in raw and self._handle_line(raw):
+                                break
+                    if eof:
+                        break
         finally:
             with self._lock:
                 self._sock = None
             sock.close()
 
+    def _handle_line(self, raw: bytes) -> bool:
+        """Parse one gpsd JSON line and store it if it is a TPV fix.
+
+        Returns True if a new fix was stored.
+        """
+        line = raw.strip()
+        if not line:
+            return False
+        try:
+            # orjson when installed; both parse the UTF-8 bytes directly
+            msg = _json_loads(line)
+        except ValueError:  # bad JSON or bad UTF-8
+            return False
+        if msg.get("class") == "TPV":
+            lat = msg.get("lat")
+            lon = msg.get("lon")
+            if lat is not None and lon is not None:
+                self._fix = (lat, lon, msg.get("alt"))
+                return True
+        return False
+
 
 _GUI_MAX_DEVICES = 1000  # server-side device cache cap
+_GUI_FULL_RESEND = 60    # max seconds between full updates for a device
+_GUI_BATCH_INTERVAL = 0.05  # seconds device updates are coalesced per frame
+_GUI_GPS_INTERVAL = 0.2     # min seconds between scanner-position frames
+_GUI_STATUS_INTERVAL = 0.5  # min seconds between scan-status frames
+
+
+def _device_delta(prev: dict, data: dict) -> dict:
+    """Return the fields of *data* that differ from *prev*, plus the address."""
+    delta = {k: v for k, v in data.items() if prev.get(k) != v}
+    delta['address'] = data['address']
+    return delta
 
 
 class GuiServer:
@@ -1697,18 +2066,29 @@ class GuiServer:
         if not _HAS_FLASK:
             raise ImportError(
                 "GUI requires Flask and flask-socketio. "
-                "Install with: pip install flask flask-socketio")
+                "Install with: pip install flask flask-socketio simple-websocket")
         self._port = port
         self._app = Flask(__name__)
         self._app.config['SECRET_KEY'] = os.urandom(24).hex()
-        self._sio = SocketIO(self._app, async_mode='threading', cors_allowed_origins='*')
+        self._sio = SocketIO(self._app, async_mode='threading',
+                             cors_allowed_origins='*', json=_SOCKETIO_JSON)
         self._thread = None
         self._lock = threading.Lock()
         self._devices: Dict[str, dict] = {}
         self._device_ts: Dict[str, float] = {}  # address -> last update time
+        self._device_full_ts: Dict[str, float] = {}  # address -> last full send
         self._scan_status: dict = {}
         self._gps_fix: Optional[dict] = None
         self._completed: Optional[dict] = None
+        # Connected SocketIO clients — with none, updates are only stored
+        # for /api/state rather than serialised and emitted
+        self._clients = 0
+        # address -> update waiting for the next device_batch frame
+        self._pending: Dict[str, dict] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        # Rate-limited events: event -> last emit time / newest held payload
+        self._last_emit: Dict[str, float] = {}
+        self._held: Dict[str, dict] = {}
         self._setup_routes()
 
     def _setup_routes(self):
@@ -1718,17 +2098,29 @@ class GuiServer:
 
         @self._app.route('/api/state')
         def state():
+            # Stored dicts are replaced, never mutated, so a shallow copy
+            # is a consistent snapshot to serialise outside the lock
             with self._lock:
-                devices_copy = json.loads(json.dumps(self._devices))
+                devices_copy = dict(self._devices)
                 status_copy = dict(self._scan_status) if self._scan_status else {}
                 gps_copy = dict(self._gps_fix) if self._gps_fix else None
                 completed_copy = dict(self._completed) if self._completed else None
-            return jsonify({
+            return self._app.response_class(_json_line({
                 'devices': devices_copy,
                 'status': status_copy,
                 'gps': gps_copy,
                 'completed': completed_copy,
-            })
+            }), mimetype='application/json')
+
+        @self._sio.on('connect')
+        def on_connect(*_):
+            with self._lock:
+                self._clients += 1
+
+        @self._sio.on('disconnect')
+        def on_disconnect(*_):
+            with self._lock:
+                self._clients = max(0, self._clients - 1)
 
     def start(self):
         """Start the Flask server in a background thread."""
@@ -1778,6 +2170,10 @@ class GuiServer:
 
     def stop(self):
         """Signal the SocketIO server to shut down."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
         try:
             self._sio.stop()
         except Exception:
@@ -1793,31 +2189,109 @@ class GuiServer:
         for addr in sorted_addrs[:to_remove]:
             del self._devices[addr]
             del self._device_ts[addr]
+            self._device_full_ts.pop(addr, None)
 
     def emit_device(self, data: dict):
-        """Push a device update to all connected clients."""
+        """Queue a device update for all connected clients.
+
+        Only the fields that changed since the device's last update are
+        sent.  A full record (flagged ``_full``) goes out for a new device
+        and at least every _GUI_FULL_RESEND seconds, so clients that
+        pruned it or connected mid-scan can pick it back up.  Updates are
+        merged per device and sent as one device_batch frame every
+        _GUI_BATCH_INTERVAL seconds.
+        """
+        addr = data['address']
+        now = time.time()
         with self._lock:
-            self._devices[data['address']] = data
-            self._device_ts[data['address']] = time.time()
+            prev = self._devices.get(addr)
+            self._devices[addr] = data
+            self._device_ts[addr] = now
             self._evict_old_devices()
-        self._sio.emit('device_update', data)
+            if not self._clients:
+                return
+            if (prev is None or now - self._device_full_ts.get(addr, 0)
+                    >= _GUI_FULL_RESEND):
+                self._device_full_ts[addr] = now
+                update = dict(data, _full=True)
+            else:
+                update = _device_delta(prev, data)
+            pending = self._pending.get(addr)
+            if pending is None:
+                self._pending[addr] = update
+            else:
+                pending.update(update)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(_GUI_BATCH_INTERVAL,
+                                                    self._flush_devices)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_devices(self):
+        """Send the queued device updates as one device_batch frame."""
+        with self._lock:
+            batch = list(self._pending.values())
+            self._pending = {}
+            self._flush_timer = None
+        if batch:
+            self._sio.emit('device_batch', batch)
+
+    def _throttle(self, event: str, data: dict, interval: float) -> bool:
+        """Rate-limit *event* to once per *interval* seconds.
+
+        Called with the lock held; returns True if *data* should be sent
+        now.  An update inside the interval is held back instead, and the
+        newest one is sent when the interval ends.
+        """
+        if not self._clients:
+            return False
+        now = time.monotonic()
+        wait = self._last_emit.get(event, 0.0) + interval - now
+        if wait > 0:
+            if event not in self._held:
+                timer = threading.Timer(wait, self._emit_held, (event,))
+                timer.daemon = True
+                timer.start()
+            self._held[event] = data
+            return False
+        self._held.pop(event, None)
+        self._last_emit[event] = now
+        return True
+
+    def _emit_held(self, event: str):
+        """Timer callback: send the newest held update for *event*."""
+        with self._lock:
+            data = self._held.pop(event, None)
+            if data is None:
+                return
+            self._last_emit[event] = time.monotonic()
+        self._sio.emit(event, data)
 
     def emit_gps(self, fix: dict):
         """Push scanner GPS position to all connected clients."""
         with self._lock:
             self._gps_fix = fix
-        self._sio.emit('gps_update', fix)
+            send = self._throttle('gps_update', fix, _GUI_GPS_INTERVAL)
+        if send:
+            self._sio.emit('gps_update', fix)
 
     def emit_status(self, status: dict):
         """Push scan status to all connected clients."""
         with self._lock:
             self._scan_status = status
-        self._sio.emit('scan_status', status)
+            send = self._throttle('scan_status', status, _GUI_STATUS_INTERVAL)
+        if send:
+            self._sio.emit('scan_status', status)
 
     def emit_complete(self, summary: dict):
         """Push scan complete event and store for reconnecting clients."""
+        self._flush_devices()
         with self._lock:
+            # A held "scanning" status must not arrive after completion
+            self._held.clear()
             self._completed = summary
+            if not self._clients:
+                return
         self._sio.emit('scan_complete', summary)
 
 
@@ -1840,7 +2314,9 @@ class BLEScanner:
                  ref_rssi: Optional[int] = None,
                  name_filter: Optional[str] = None,
                  gui: bool = False,
-                 gui_port: int = 5000):
+                 gui_port: int = 5000,
+                 log_format: str = "csv",
+                 top: int = _SUMMARY_TOP):
         self.target_mac = target_mac.upper() if target_mac else None
         self.targeted = target_mac is not None
         self.timeout = timeout
@@ -1850,147 +2326,268 @@ class BLEScanner:
         # IRK mode — supports one or more keys
         self.irks = irks or []
         self.irk_mode = len(self.irks) > 0
+        # One long-lived AES context per IRK — the key schedule is expanded
+        # once here instead of on every advertisement.  Only the bound
+        # update() methods are kept so the per-IRK loop does no lookups.
+        self._irk_encrypt = tuple(_ecb_encryptor(irk).update
+                                  for irk in self.irks)
+        # address -> index of the matching IRK, or -1.  RPAs rotate, so the
+        # oldest entries are dropped once _IRK_CACHE_MAX is reached.
+        self._irk_results: Dict[str, int] = {}
         self.resolved_devices: Dict[str, int] = {}
         self.rpa_count = 0
-        self.non_rpa_warned: Set[str] = set()
+        # UUID addresses already warned about (Bloom filter — fixed size
+        # however many CoreBluetooth UUIDs show up)
+        self._warned_bloom = bytearray(_WARN_BLOOM_BYTES)
+        # Most recently warned UUIDs in LRU order.  Until it overflows a
+        # Bloom hit is only trusted when confirmed here, so a false positive
+        # cannot swallow the warning for a new address.  After that a hit
+        # is taken as final: evicted addresses must not warn on every
+        # advertisement, and a false positive only skips one warning.
+        self._warned_recent: Dict[str, None] = {}
+        self._warned_overflow = False
         # Options
         self.verbose = verbose
         self.quiet = quiet
         self.min_rssi = min_rssi
+        self.top = top
         self.output_format = output_format
         self.output_file = output_file
-        self.records: List[dict] = []
-        # RSSI averaging
+        # Batch output never holds records in memory.  CSV and JSONL files
+        # are written as records arrive; JSON output (and anything bound
+        # for stdout) is spooled to a temp file already in its final
+        # format and copied out when the scan ends.
+        self._out_fh = None
+        self._out_spooled = False
+        self._out_csv = None
+        self._out_sep = b"[\n  "         # written before the next JSON item
+        self.record_count = 0
+        # RSSI averaging — one flat ring buffer shared by all devices
+        # (device i owns slots i*window .. i*window+window-1) plus a running
+        # sum per device, so each update is O(1) regardless of window size
         self.rssi_window = max(1, rssi_window)
-        self.rssi_history: Dict[str, deque] = {}
+        self._rssi_ids: Dict[str, int] = {}
+        self._rssi_buf = array("h")
+        self._rssi_head: List[int] = []
+        self._rssi_count: List[int] = []
+        self._rssi_sum: List[int] = []
         # Scanning mode
         self.active = active
         # Environment for distance estimation
         self.environment = environment
+        # (rssi, tx_power) -> rounded distance, or "" when unknown
+        self._dist_cache: Dict[Tuple[int, Optional[int]], Union[float, str]] = {}
         # Proximity alerts
         self.alert_within = alert_within
-        # Real-time CSV log
+        # Real-time log (CSV, or packed records for "binary")
         self.log_file = log_file
+        self.log_format = log_format
+        self._bin_addrs: Dict[str, Tuple[int, bytes]] = {}
+        # last record timestamp packed, with its (epoch, UTC offset)
+        self._bin_ts: Tuple[str, int, int] = ("", 0, 0)
         self._log_writer = None
         self._log_fh = None
-        # Only accumulate records in memory when batch output is requested.
-        # For long-running scans without --output, this prevents unbounded
-        # memory growth.  Real-time logging (--log) writes directly to disk.
-        self._accumulate_records = (output_format is not None)
+        self._log_batch: List[tuple] = []
+        self._log_last_flush = 0.0
         # TUI mode
         self.tui = tui
-        self.tui_devices: Dict[str, dict] = {}
+        self.tui_devices: Dict[str, TuiDevice] = {}
         self._tui_screen = None
         self._tui_start = 0.0
+        # Redraw only when a device changed or the elapsed second ticks
+        self._tui_dirty = True
+        self._tui_drawn_second = -1
         # Multi-adapter
         self.adapters = adapters
         # Reference RSSI calibration
         self.ref_rssi = ref_rssi
-        # Name filter
+        # Name filter (folded once, not per advertisement)
         self.name_filter = name_filter
+        self._name_filter_cf = (name_filter.casefold()
+                                if name_filter is not None else None)
+        # Raw address -> normalised upper-case address; like _irk_results,
+        # the oldest entries are dropped once _IRK_CACHE_MAX is reached
+        self._addr_upper: Dict[str, str] = {}
+        # The feature flags are fixed from here on — plain discover-all
+        # scans get a callback without the per-advertisement checks
+        if (not self.irk_mode and not self.targeted
+                and self.min_rssi is None and self._name_filter_cf is None
+                and self.rssi_window == 1):
+            self._detection_callback_inner = self._detect_unfiltered
         # GPS
         self._gps = GpsdReader() if gps else None
         self.device_best_gps: Dict[str, dict] = {}
-        # Thread safety for detection callback (multi-adapter)
-        self._cb_lock = threading.Lock()
+        # Set once a summarised device (every device, or only IRK matches in
+        # IRK mode) has a best GPS fix, so the summary needn't scan for one
+        self._any_gps_seen = False
+        # Detections arriving on another thread (e.g. a second adapter's
+        # backend) are queued and handled on the event loop, so all
+        # scanner state is only ever touched from one thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._ev_queue: deque = deque()
+        self._drain_scheduled = False
         # GUI mode
         self.gui = gui
         self.gui_port = gui_port
         self._gui_server = None
+        self._gui_last_fix: Optional[Tuple[float, float, Optional[float]]] = None
+        # (detections, unique devices, whole seconds) of the last status sent
+        self._gui_last_status: Optional[Tuple[int, int, int]] = None
+
+    def _addr_key(self, raw_addr: Optional[str]) -> str:
+        """Return the canonical upper-case key for a device address.
+
+        While an address stays cached the same str object is handed back
+        for every sighting, so its hash is computed once and dict lookups
+        compare by identity.  The cache is bounded because rotating RPAs
+        would otherwise grow it for the whole scan.
+        """
+        cache = self._addr_upper
+        addr = cache.get(raw_addr)
+        if addr is None:
+            if len(cache) >= _IRK_CACHE_MAX:
+                del cache[next(iter(cache))]
+            addr = cache[raw_addr] = (raw_addr or "").upper()
+        return addr
 
     def _avg_rssi(self, addr: str, rssi: int) -> int:
         """Update RSSI sliding window for a device and return the average."""
-        if addr not in self.rssi_history:
-            self.rssi_history[addr] = deque(maxlen=self.rssi_window)
-        self.rssi_history[addr].append(rssi)
-        return round(sum(self.rssi_history[addr]) / len(self.rssi_history[addr]))
+        window = self.rssi_window
+        buf = self._rssi_buf
+        heads = self._rssi_head
+        counts = self._rssi_count
+        sums = self._rssi_sum
+        dev = self._rssi_ids.get(addr)
+        if dev is None:
+            dev = self._rssi_ids[addr] = len(heads)
+            buf.extend(bytes(2 * window))
+            heads.append(0)
+            counts.append(0)
+            sums.append(0)
+        head = heads[dev]
+        slot = dev * window + head
+        count = counts[dev]
+        total = sums[dev] + rssi
+        if count == window:
+            # Window full — the slot being overwritten is the oldest sample
+            total -= buf[slot]
+        else:
+            count = counts[dev] = count + 1
+        buf[slot] = rssi
+        sums[dev] = total
+        heads[dev] = head + 1 if head + 1 < window else 0
+        return round(total / count)
+
+    def _rssi_samples(self, addr: str) -> int:
+        """Return how many readings are in a device's RSSI window."""
+        dev = self._rssi_ids.get(addr)
+        return self._rssi_count[dev] if dev is not None else 0
 
     def _build_record(self, device: BLEDevice, adv: AdvertisementData,
                       resolved: Optional[bool] = None,
-                      avg_rssi: Optional[int] = None) -> dict:
-        """Build a record dict from device/adv data."""
+                      avg_rssi: Optional[int] = None) -> Record:
+        """Build a Record from device/adv data."""
         rssi = adv.rssi
         tx_power = adv.tx_power
         rssi_for_dist = avg_rssi if avg_rssi is not None else rssi
-        dist = _estimate_distance(rssi_for_dist, tx_power, self.environment,
-                                  ref_rssi=self.ref_rssi)
-
-        mfr_data = ""
-        if adv.manufacturer_data:
-            parts = []
-            for mfr_id, data in adv.manufacturer_data.items():
-                parts.append(f"0x{mfr_id:04X}:{data.hex()}")
-            mfr_data = "; ".join(parts)
-
-        service_uuids = ", ".join(adv.service_uuids) if adv.service_uuids else ""
-
-        return {
-            "timestamp": _timestamp(),
-            "address": device.address,
-            "name": device.name or "Unknown",
-            "rssi": rssi,
-            "avg_rssi": avg_rssi if avg_rssi is not None else "",
-            "tx_power": tx_power if tx_power is not None else "",
-            "est_distance": round(dist, 2) if dist is not None else "",
-            "latitude": "",
-            "longitude": "",
-            "gps_altitude": "",
-            "manufacturer_data": mfr_data,
-            "service_uuids": service_uuids,
-            "resolved": resolved if resolved is not None else "",
-        }
+        # RSSI and TX power are small integers and the environment is fixed,
+        # so each distinct pair is only run through pow() once
+        dist_key = (rssi_for_dist, tx_power)
+        est_distance = self._dist_cache.get(dist_key)
+        if est_distance is None:
+            dist = _estimate_distance(rssi_for_dist, tx_power, self.environment,
+                                      ref_rssi=self.ref_rssi)
+            est_distance = self._dist_cache[dist_key] = (
+                round(dist, 2) if dist is not None else "")
+
+        return Record(
+            _timestamp(),
+            device.address,
+            device.name or "Unknown",
+            rssi,
+            avg_rssi if avg_rssi is not None else "",
+            tx_power if tx_power is not None else "",
+            est_distance,
+            "", "", "",
+            adv.manufacturer_data,
+            adv.service_uuids,
+            resolved if resolved is not None else "",
+        )
 
     def _record_device(self, device: BLEDevice, adv: AdvertisementData,
                        resolved: Optional[bool] = None,
-                       avg_rssi: Optional[int] = None) -> dict:
-        """Build a record, optionally append to self.records, write to live
-        log, and update TUI state.  Returns the record dict."""
+                       avg_rssi: Optional[int] = None,
+                       addr: Optional[str] = None) -> Record:
+        """Build a record, optionally spool it for batch output, write to live
+        log, and update TUI state.  Returns the Record.
+
+        *addr* is the normalised address key when the caller already has it.
+        """
         record = self._build_record(device, adv, resolved=resolved, avg_rssi=avg_rssi)
+        if addr is None:
+            addr = self._addr_key(device.address)
 
         # Stamp GPS coordinates on this record
         if self._gps is not None:
             fix = self._gps.fix
             if fix is not None:
-                record["latitude"] = fix["lat"]
-                record["longitude"] = fix["lon"]
-                record["gps_altitude"] = fix["alt"] if fix["alt"] is not None else ""
+                lat, lon, alt = fix
+                record.latitude = lat
+                record.longitude = lon
+                record.gps_altitude = alt if alt is not None else ""
                 # Track per-device best GPS (strongest RSSI = closest proximity)
-                addr = (device.address or "").upper()
                 current_rssi = adv.rssi
                 best = self.device_best_gps.get(addr)
+                if best is None and resolved is not False:
+                    self._any_gps_seen = True
                 if best is None or current_rssi > best["rssi"]:
                     self.device_best_gps[addr] = {
-                        "lat": fix["lat"],
-                        "lon": fix["lon"],
+                        "lat": lat,
+                        "lon": lon,
                         "rssi": current_rssi,
                     }
 
-        # Accumulate records only when batch output is needed
-        if self._accumulate_records:
-            self.records.append(record)
+        # Batch output (written through, or spooled for JSON / stdout)
+        if self._out_fh is not None:
+            if self._out_csv is not None:
+                self._out_csv.writerow(_record_row(record))
+            elif self.output_format == "json":
+                # Spooled in its final json.dump(indent=2) layout
+                item = _json_indent(record.as_dict()).replace(b"\n", b"\n  ")
+                self._out_fh.write(self._out_sep + item)
+                self._out_sep = b",\n  "
+            else:
+                self._out_fh.write(_json_line(record.as_dict()))
+            self.record_count += 1
 
         # Real-time CSV logging
         if self._log_writer is not None:
-            self._log_writer.writerow(record)
-            self._log_fh.flush()
+            if self.log_format == "binary":
+                self._log_batch.append(self._binary_row(record))
+            else:
+                self._log_batch.append(_record_row(record))
+            if (len(self._log_batch) >= _LOG_BATCH_ROWS
+                    or time.monotonic() - self._log_last_flush
+                    >= _LOG_FLUSH_INTERVAL):
+                self._flush_log()
 
         # Update TUI device state
         if self.tui:
-            addr = (device.address or "").upper()
-            self.tui_devices[addr] = {
-                "address": device.address,
-                "name": device.name or "Unknown",
-                "rssi": adv.rssi,
-                "avg_rssi": avg_rssi,
-                "est_distance": record["est_distance"],
-                "times_seen": self.unique_devices.get(addr, 0),
-                "last_seen": time.strftime("%H:%M:%S"),
-                "resolved": resolved,
-            }
+            dev = self.tui_devices.get(addr)
+            if dev is None:
+                dev = self.tui_devices[addr] = TuiDevice(device.address)
+            dev.name = record.name
+            dev.rssi = adv.rssi
+            dev.avg_rssi = avg_rssi
+            dev.est_distance = record.est_distance
+            dev.times_seen = self.unique_devices.get(addr, 0)
+            dev.last_seen = time.time()
+            dev.resolved = resolved
+            self._tui_dirty = True
 
         # Update GUI
         if self.gui and self._gui_server is not None:
-            addr = (device.address or "").upper()
             best_gps = self.device_best_gps.get(addr)
             self._gui_server.emit_device({
                 'address': device.address,
@@ -1998,41 +2595,68 @@ class BLEScanner:
                 'rssi': adv.rssi,
                 'avg_rssi': avg_rssi,
                 'tx_power': adv.tx_power,
-                'est_distance': record['est_distance'],
-                'latitude': record.get('latitude', ''),
-                'longitude': record.get('longitude', ''),
+                'est_distance': record.est_distance,
+                'latitude': record.latitude,
+                'longitude': record.longitude,
                 'best_gps': best_gps,
-                'manufacturer_data': record.get('manufacturer_data', ''),
-                'service_uuids': record.get('service_uuids', ''),
+                'manufacturer_data': record.manufacturer_data,
+                'service_uuids': record.service_uuids,
                 'times_seen': self.unique_devices.get(addr, 0),
-                'last_seen': time.strftime('%H:%M:%S'),
+                'last_seen': record.timestamp[11:19],
                 'resolved': resolved,
-                'timestamp': record['timestamp'],
+                'timestamp': record.timestamp,
             })
 
         # Proximity alert
-        if self.alert_within is not None and record["est_distance"] != "":
-            if record["est_distance"] <= self.alert_within:
+        if self.alert_within is not None and record.est_distance != "":
+            if record.est_distance <= self.alert_within:
                 if self.tui and self._tui_screen is not None:
                     curses.beep()
                 elif not self.quiet and not self.gui:
                     print(f"\a  ** PROXIMITY ALERT ** {device.address} "
-                          f"within ~{record['est_distance']:.1f}m "
+                          f"within ~{record.est_distance:.1f}m "
                           f"(threshold: {self.alert_within}m)")
 
         return record
 
+    def _flush_log(self):
+        """Write buffered live-log rows and flush them to disk."""
+        if self._log_batch:
+            if self.log_format == "binary":
+                self._log_fh.write(b"".join(self._log_batch))
+            else:
+                self._log_writer.writerows(self._log_batch)
+            self._log_batch.clear()
+        self._log_fh.flush()
+        self._log_last_flush = time.monotonic()
+
+    def _binary_row(self, record: Record) -> bytes:
+        """Pack a record for the binary live log."""
+        address = record.address
+        addr = self._bin_addrs.get(address)
+        if addr is None:
+            addr = self._bin_addrs[address] = _encode_bin_address(address)
+        # Timestamps only change once a second, so parse each one once
+        ts = record.timestamp
+        if ts != self._bin_ts[0]:
+            self._bin_ts = (ts, *_bin_timestamp(ts))
+        return _pack_bin_record(record, addr, self._bin_ts[1:])
+
     def _print_device(self, device: BLEDevice, adv: AdvertisementData,
                       label: str, resolved: Optional[bool] = None,
-                      avg_rssi: Optional[int] = None):
+                      avg_rssi: Optional[int] = None,
+                      addr: Optional[str] = None):
+        if addr is None:
+            addr = self._addr_key(device.address)
         # Always record for output / log / TUI
-        record = self._record_device(device, adv, resolved=resolved, avg_rssi=avg_rssi)
+        record = self._record_device(device, adv, resolved=resolved,
+                                     avg_rssi=avg_rssi, addr=addr)
 
         if self.quiet or self.tui or self.gui:
             return
 
         rssi = adv.rssi
-        dist = record["est_distance"]
+        dist = record.est_distance
 
         print(f"\n{'='*60}")
         print(f"  {label}")
@@ -2045,8 +2669,7 @@ class BLEScanner:
         print(addr_line)
         print(f"  Name         : {device.name or 'Unknown'}")
         if avg_rssi is not None and self.rssi_window > 1:
-            addr_key = (device.address or "").upper()
-            n_samples = len(self.rssi_history.get(addr_key, []))
+            n_samples = self._rssi_samples(addr)
             print(f"  RSSI         : {rssi} dBm  (avg: {avg_rssi} dBm over {n_samples} readings)")
         else:
             print(f"  RSSI         : {rssi} dBm")
@@ -2067,20 +2690,36 @@ class BLEScanner:
         if adv.platform_data:
             for item in adv.platform_data:
                 print(f"  Platform Data: {item}")
-        addr_key = (device.address or "").upper()
-        best_gps = self.device_best_gps.get(addr_key)
+        best_gps = self.device_best_gps.get(addr)
         if best_gps:
             print(f"  Best GPS     : {best_gps['lat']:.6f}, {best_gps['lon']:.6f}")
-        print(f"  Timestamp    : {time.strftime('%H:%M:%S')}")
+        print(f"  Timestamp    : {record.timestamp[11:19]}")
         print(f"{'='*60}")
 
     def detection_callback(self, device: BLEDevice, adv: AdvertisementData):
-        with self._cb_lock:
+        if self._loop is None or threading.get_ident() == self._loop_thread:
             self._detection_callback_inner(device, adv)
+            return
+        self._ev_queue.append((device, adv))
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            self._loop.call_soon_threadsafe(self._drain_events)
+
+    def _drain_events(self):
+        """Process detections queued from other threads (runs on the loop)."""
+        self._drain_scheduled = False
+        queue = self._ev_queue
+        inner = self._detection_callback_inner
+        while queue:
+            inner(*queue.popleft())
 
     def _detection_callback_inner(self, device: BLEDevice,
                                   adv: AdvertisementData):
-        addr = (device.address or "").upper()
+        addr = self._addr_key(device.address)
+
+        # Targeted mode: drop other devices before any per-device work
+        if self.targeted and self.target_mac not in addr:
+            return
 
         # Compute averaged RSSI when windowing is enabled
         avg_rssi = self._avg_rssi(addr, adv.rssi) if self.rssi_window > 1 else None
@@ -2091,9 +2730,8 @@ class BLEScanner:
             return
 
         # Name filtering (case-insensitive substring match)
-        if self.name_filter is not None:
-            name = device.name or ""
-            if self.name_filter.lower() not in name.lower():
+        if self._name_filter_cf is not None:
+            if self._name_filter_cf not in (device.name or "").casefold():
                 return
 
         if self.irk_mode:
@@ -2101,19 +2739,27 @@ class BLEScanner:
             return
 
         if self.targeted:
-            if self.target_mac not in addr:
-                return
             self.seen_count += 1
             self._print_device(device, adv,
                                f"TARGET FOUND  —  detection #{self.seen_count}",
-                               avg_rssi=avg_rssi)
+                               avg_rssi=avg_rssi, addr=addr)
         else:
             times_seen = self.unique_devices.get(addr, 0) + 1
             self.unique_devices[addr] = times_seen
             self.seen_count += 1
             self._print_device(device, adv,
                                f"DEVICE #{len(self.unique_devices)}  —  seen {times_seen}x",
-                               avg_rssi=avg_rssi)
+                               avg_rssi=avg_rssi, addr=addr)
+
+    def _detect_unfiltered(self, device: BLEDevice, adv: AdvertisementData):
+        """_detection_callback_inner for discover-all with no filters."""
+        addr = self._addr_key(device.address)
+        times_seen = self.unique_devices.get(addr, 0) + 1
+        self.unique_devices[addr] = times_seen
+        self.seen_count += 1
+        self._print_device(device, adv,
+                           f"DEVICE #{len(self.unique_devices)}  —  seen {times_seen}x",
+                           addr=addr)
 
     def _irk_detection(self, device: BLEDevice, adv: AdvertisementData,
                        addr: str, avg_rssi: Optional[int] = None):
@@ -2122,21 +2768,38 @@ class BLEScanner:
 
         is_uuid = len(addr.replace("-", "")) == 32 and ":" not in addr
         if is_uuid:
-            if addr not in self.non_rpa_warned:
-                self.non_rpa_warned.add(addr)
-                if not self.quiet and not self.tui and not self.gui:
-                    print(f"  [!] UUID address {addr} — cannot resolve (need real MAC)")
+            recent = self._warned_recent
+            if _bloom_add(self._warned_bloom, addr):
+                if addr in recent:
+                    # Confirmed repeat: move it to the most recent end
+                    del recent[addr]
+                    recent[addr] = None
+                    return
+                if self._warned_overflow:
+                    return
+            recent[addr] = None
+            if len(recent) > _WARN_RECENT_MAX:
+                del recent[next(iter(recent))]
+                self._warned_overflow = True
+            if not self.quiet and not self.tui and not self.gui:
+                print(f"  [!] UUID address {addr} — cannot resolve (need real MAC)")
             return
 
         times_seen = self.unique_devices.get(addr, 0) + 1
         self.unique_devices[addr] = times_seen
 
-        # Check address against all loaded IRKs
-        resolved = False
-        for irk in self.irks:
-            if _resolve_rpa(irk, addr):
-                resolved = True
-                break
+        # Check address against all loaded IRKs.  The answer for an address
+        # never changes, so each one is only encrypted on first sighting.
+        irk_index = self._irk_results.get(addr)
+        if irk_index is None:
+            parts = _rpa_parts(addr)
+            irk_index = (_match_irk(self._irk_encrypt, *parts)
+                         if parts is not None else -1)
+            results = self._irk_results
+            if len(results) >= _IRK_CACHE_MAX:
+                del results[next(iter(results))]
+            results[addr] = irk_index
+        resolved = irk_index >= 0
 
         if resolved:
             self.rpa_count += 1
@@ -2145,14 +2808,14 @@ class BLEScanner:
             self._print_device(
                 device, adv,
                 f"IRK RESOLVED  —  match #{det_count} (addr seen {times_seen}x)",
-                resolved=True, avg_rssi=avg_rssi,
+                resolved=True, avg_rssi=avg_rssi, addr=addr,
             )
         else:
             if self.verbose:
                 self._print_device(
                     device, adv,
                     f"IRK NO MATCH  —  addr seen {times_seen}x",
-                    resolved=False, avg_rssi=avg_rssi,
+                    resolved=False, avg_rssi=avg_rssi, addr=addr,
                 )
 
     # ------------------------------------------------------------------
@@ -2186,51 +2849,49 @@ class BLEScanner:
             if self._gps is not None:
                 fix = self._gps.fix
                 if fix is not None:
-                    settings += f" | GPS: {fix['lat']:.5f},{fix['lon']:.5f}"
+                    settings += f" | GPS: {fix[0]:.5f},{fix[1]:.5f}"
                 elif self._gps.connected:
                     settings += " | GPS: no fix"
                 else:
                     settings += " | GPS: offline"
             screen.addnstr(1, 0, settings, w - 1, curses.A_DIM)
 
-            col_fmt = " {:<19s} {:<16s} {:>5s} {:>5s} {:>7s} {:>5s} {:>8s}"
-            col_hdr = col_fmt.format(
-                "Address", "Name", "RSSI", "Avg", "Dist", "Seen", "Last")
-            screen.addnstr(3, 0, col_hdr, w - 1, curses.A_UNDERLINE)
+            col_fmt = _TUI_COL_FMT
+            screen.addnstr(3, 0, _TUI_COL_HDR, w - 1, curses.A_UNDERLINE)
 
-            sorted_devs = sorted(
-                self.tui_devices.values(),
-                key=lambda d: d["rssi"], reverse=True,
-            )
+            # Only the rows that fit are ordered — O(n log k) rather than
+            # a full sort of every device ever seen
+            visible = max(0, h - 5)
+            top_devs = heapq.nlargest(visible, self.tui_devices.values(),
+                                      key=_tui_rssi)
 
             row = 4
-            for dev in sorted_devs:
-                if row >= h - 1:
-                    remaining = len(sorted_devs) - (row - 4)
-                    screen.addnstr(
-                        h - 1, 0,
-                        f" ... {remaining} more (resize terminal)", w - 1)
-                    break
-                avg_str = str(dev["avg_rssi"]) if dev["avg_rssi"] is not None else ""
-                dist_str = (f"~{dev['est_distance']:.1f}m"
-                            if isinstance(dev["est_distance"], (int, float))
+            for dev in top_devs:
+                avg_str = str(dev.avg_rssi) if dev.avg_rssi is not None else ""
+                dist = dev.est_distance
+                dist_str = (f"~{dist:.1f}m" if isinstance(dist, (int, float))
                             else "")
                 line = col_fmt.format(
-                    (dev["address"] or "")[:18],
-                    dev["name"][:15],
-                    str(dev["rssi"]), avg_str, dist_str,
-                    f"{dev['times_seen']}x",
-                    dev["last_seen"],
+                    (dev.address or "")[:18],
+                    dev.name[:15],
+                    str(dev.rssi), avg_str, dist_str,
+                    f"{dev.times_seen}x",
+                    time.strftime("%H:%M:%S", time.localtime(dev.last_seen)),
                 )
                 attr = curses.A_NORMAL
-                if dev.get("resolved") is True:
+                if dev.resolved is True:
                     attr = curses.A_BOLD
                 if (self.alert_within is not None
-                        and isinstance(dev["est_distance"], (int, float))
-                        and dev["est_distance"] <= self.alert_within):
+                        and isinstance(dist, (int, float))
+                        and dist <= self.alert_within):
                     attr |= curses.A_STANDOUT
                 screen.addnstr(row, 0, line, w - 1, attr)
                 row += 1
+            if len(self.tui_devices) > visible:
+                remaining = len(self.tui_devices) - visible
+                screen.addnstr(
+                    h - 1, 0,
+                    f" ... {remaining} more (resize terminal)", w - 1)
 
             footer = " Press Ctrl+C to stop"
             if self.log_file:
@@ -2238,6 +2899,8 @@ class BLEScanner:
             screen.addnstr(h - 1, 0, footer, w - 1, curses.A_DIM)
 
             screen.refresh()
+            self._tui_dirty = False
+            self._tui_drawn_second = round(elapsed)
         except curses.error:
             pass
 
@@ -2249,7 +2912,7 @@ class BLEScanner:
         # Install signal handlers inside the async context for clean
         # shutdown without the signal-handler / KeyboardInterrupt race.
         loop = asyncio.get_running_loop()
-        if platform.system() != "Windows":
+        if _PLATFORM != "Windows":
             loop.add_signal_handler(signal.SIGINT, self.stop)
             loop.add_signal_handler(signal.SIGTERM, self.stop)
 
@@ -2259,14 +2922,26 @@ class BLEScanner:
             await asyncio.sleep(_GPS_STARTUP_DELAY)
 
         elapsed = 0.0
+        scanned = False
         try:
             # Open real-time CSV log
-            if self.log_file:
-                self._log_fh = open(self.log_file, "w", newline="")
-                self._log_writer = csv.DictWriter(self._log_fh,
-                                                  fieldnames=_FIELDNAMES)
-                self._log_writer.writeheader()
-                self._log_fh.flush()
+            if self.log_file and self.log_format == "binary":
+                self._log_fh = open(self.log_file, "wb",
+                                    buffering=_OUTPUT_BUFFER)
+                self._log_writer = self._log_fh
+                self._log_fh.write(_BIN_MAGIC)
+                self._flush_log()
+            elif self.log_file:
+                self._log_fh = open(self.log_file, "w", newline="",
+                                    buffering=_OUTPUT_BUFFER)
+                self._log_writer = csv.writer(self._log_fh)
+                self._log_writer.writerow(_FIELDNAMES)
+                self._flush_log()
+
+            # Open batch output up front so a bad -o path fails here, not
+            # in the detection callback
+            if self.output_format is not None:
+                self._open_output()
 
             # GUI setup
             if self.gui:
@@ -2284,6 +2959,7 @@ class BLEScanner:
                     curses.use_default_colors()
 
             elapsed = await self._scan_loop()
+            scanned = True
         finally:
             # TUI cleanup
             if self._tui_screen is not None:
@@ -2297,12 +2973,19 @@ class BLEScanner:
             if self._gps is not None:
                 self._gps.stop()
 
-            # Close log file (under lock to prevent race with callback)
-            with self._cb_lock:
-                if self._log_fh is not None:
-                    self._log_fh.close()
-                    self._log_fh = None
-                    self._log_writer = None
+            # Close log file
+            if self._log_fh is not None:
+                self._flush_log()
+                self._log_fh.close()
+                self._log_fh = None
+                self._log_writer = None
+
+            # Close batch output.  Rows written straight to the file are
+            # complete now; a spool is kept for _write_output() to convert
+            # unless the scan failed.
+            if self._out_fh is not None and (not self._out_spooled
+                                             or not scanned):
+                self._close_output()
 
             # GUI scan complete + shutdown
             if self.gui and self._gui_server is not None:
@@ -2329,21 +3012,35 @@ class BLEScanner:
         self._write_output()
 
     def _poll_tick(self, start: float):
-        """One tick of the scan loop: redraw TUI, emit GUI status/GPS."""
+        """One tick of the scan loop: redraw TUI, flush live log, emit GUI status/GPS."""
         if self._tui_screen is not None:
-            self._redraw_tui(self._tui_screen)
+            if (self._tui_dirty or round(time.time() - self._tui_start)
+                    != self._tui_drawn_second):
+                self._redraw_tui(self._tui_screen)
+        # Don't let a quiet spell leave live-log rows sitting in the batch
+        if (self._log_batch
+                and time.monotonic() - self._log_last_flush
+                >= _LOG_FLUSH_INTERVAL and self._log_fh is not None):
+            self._flush_log()
         if self.gui and self._gui_server is not None:
             el = time.time() - start
-            self._gui_server.emit_status({
-                'elapsed': round(el, 1),
-                'total_detections': self.seen_count,
-                'unique_count': len(self.unique_devices),
-                'scanning': True,
-            })
+            # The page shows mm:ss, so an idle scan needs one frame a second
+            status_key = (self.seen_count, len(self.unique_devices), int(el))
+            if status_key != self._gui_last_status:
+                self._gui_last_status = status_key
+                self._gui_server.emit_status({
+                    'elapsed': round(el, 1),
+                    'total_detections': self.seen_count,
+                    'unique_count': len(self.unique_devices),
+                    'scanning': True,
+                })
             if self._gps is not None:
                 fix = self._gps.fix
-                if fix is not None:
-                    self._gui_server.emit_gps(fix)
+                # Only push the scanner position when it has moved
+                if fix is not None and fix != self._gui_last_fix:
+                    self._gui_last_fix = fix
+                    self._gui_server.emit_gps(
+                        {"lat": fix[0], "lon": fix[1], "alt": fix[2]})
 
     async def _scan_loop(self) -> float:
         """Run the BLE scanner and return elapsed seconds."""
@@ -2353,7 +3050,7 @@ class BLEScanner:
         scanner_kwargs: dict = {"detection_callback": self.detection_callback}
         if self.active:
             scanner_kwargs["scanning_mode"] = "active"
-        if self.irk_mode and platform.system() == "Darwin":
+        if self.irk_mode and _PLATFORM == "Darwin":
             # Undocumented CoreBluetooth API to retrieve real BD_ADDR
             # instead of CoreBluetooth UUIDs.  May break in future
             # Bleak releases.
@@ -2368,6 +3065,8 @@ class BLEScanner:
         else:
             scanners.append(BleakScanner(**scanner_kwargs))
 
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
         for s in scanners:
             await s.start()
 
@@ -2389,6 +3088,8 @@ class BLEScanner:
         finally:
             for s in scanners:
                 await s.stop()
+            self._drain_events()
+            self._loop = None
 
         return time.time() - start
 
@@ -2404,12 +3105,11 @@ class BLEScanner:
                 print(f"Mode: IRK RESOLUTION — resolving RPAs against {n_irks} IRKs")
                 for i, irk in enumerate(self.irks, 1):
                     print(f"  IRK #{i}: {_mask_irk(irk.hex())}")
-            _os = platform.system()
-            if _os == "Darwin":
+            if _PLATFORM == "Darwin":
                 print("  Note: using undocumented macOS API to retrieve real BT addresses")
-            elif _os == "Linux":
+            elif _PLATFORM == "Linux":
                 print("  Note: Linux/BlueZ — may require root or CAP_NET_ADMIN")
-            elif _os == "Windows":
+            elif _PLATFORM == "Windows":
                 print("  Note: Windows/WinRT — real MAC addresses available natively")
         elif self.targeted:
             print(f"Mode: TARGETED — searching for {self.target_mac}")
@@ -2421,7 +3121,7 @@ class BLEScanner:
             print(f"  |  RSSI averaging: window of {self.rssi_window}")
         else:
             print()
-        if self.active and platform.system() == "Darwin":
+        if self.active and _PLATFORM == "Darwin":
             print("  Note: CoreBluetooth always scans actively regardless of this flag")
         if self.environment != "free_space":
             print(f"Environment: {self.environment} "
@@ -2439,7 +3139,7 @@ class BLEScanner:
         if self._gps is not None:
             fix = self._gps.fix
             if fix is not None:
-                print(f"GPS: connected ({fix['lat']:.6f}, {fix['lon']:.6f})")
+                print(f"GPS: connected ({fix[0]:.6f}, {fix[1]:.6f})")
             elif self._gps.connected:
                 print("GPS: waiting for fix")
             else:
@@ -2462,22 +3162,21 @@ class BLEScanner:
             print(f"  IRK matches      : {self.rpa_count} detections "
                   f"across {len(self.resolved_devices)} address(es)")
             if self.resolved_devices:
-                has_gps = any(a in self.device_best_gps for a in self.resolved_devices)
+                has_gps = self._any_gps_seen
                 print(f"\n  Resolved addresses:")
-                if has_gps:
-                    print(f"  {'Address':<20} {'Detections':>11}  {'Best GPS'}")
-                    print(f"  {'—'*20} {'—'*11}  {'—'*24}")
-                else:
-                    print(f"  {'Address':<20} {'Detections':>11}")
-                    print(f"  {'—'*20} {'—'*11}")
-                for addr, count in sorted(self.resolved_devices.items(),
-                                          key=lambda x: x[1], reverse=True):
+                print(*(_SUMMARY_RESOLVED_HDR_GPS if has_gps
+                        else _SUMMARY_RESOLVED_HDR), sep="\n")
+                rows = self._top_counts(self.resolved_devices)
+                lines = []
+                for addr, count in rows:
                     line = f"  {addr:<20} {count:>10}x"
                     if has_gps:
                         bg = self.device_best_gps.get(addr)
-                        gps_str = f"  {bg['lat']:.6f}, {bg['lon']:.6f}" if bg else ""
-                        line += gps_str
-                    print(line)
+                        if bg:
+                            line += f"  {bg['lat']:.6f}, {bg['lon']:.6f}"
+                    lines.append(line)
+                sys.stdout.write("\n".join(lines) + "\n")
+                self._print_more(len(self.resolved_devices) - len(rows))
             if not self.resolved_devices:
                 print("\n  No addresses resolved — the device may not be "
                       "broadcasting,")
@@ -2485,69 +3184,273 @@ class BLEScanner:
         elif not self.targeted:
             print(f"  Unique devices   : {len(self.unique_devices)}")
             if self.unique_devices:
-                has_gps = any(a in self.device_best_gps for a in self.unique_devices)
-                if has_gps:
-                    print(f"\n  {'Address':<40} {'Seen':>6}  {'Best GPS'}")
-                    print(f"  {'—'*40} {'—'*6}  {'—'*24}")
-                else:
-                    print(f"\n  {'Address':<40} {'Seen':>6}")
-                    print(f"  {'—'*40} {'—'*6}")
-                for addr, count in sorted(self.unique_devices.items(),
-                                          key=lambda x: x[1], reverse=True):
+                has_gps = self._any_gps_seen
+                print(*(_SUMMARY_DEVICES_HDR_GPS if has_gps
+                        else _SUMMARY_DEVICES_HDR), sep="\n")
+                rows = self._top_counts(self.unique_devices)
+                lines = []
+                for addr, count in rows:
                     line = f"  {addr:<40} {count:>5}x"
                     if has_gps:
                         bg = self.device_best_gps.get(addr)
-                        gps_str = f"  {bg['lat']:.6f}, {bg['lon']:.6f}" if bg else ""
-                        line += gps_str
-                    print(line)
+                        if bg:
+                            line += f"  {bg['lat']:.6f}, {bg['lon']:.6f}"
+                    lines.append(line)
+                sys.stdout.write("\n".join(lines) + "\n")
+                self._print_more(len(self.unique_devices) - len(rows))
+
+    def _top_counts(self, counts: Dict[str, int]) -> List[Tuple[str, int]]:
+        """Return the summary rows (address, count), most seen first.
+
+        Only the top ``self.top`` are ordered (O(n log k)) unless verbose
+        mode or ``top == 0`` asks for the full list.
+        """
+        if self.verbose or not self.top or len(counts) <= self.top:
+            return sorted(counts.items(), key=_count_key, reverse=True)
+        return heapq.nlargest(self.top, counts.items(), key=_count_key)
+
+    @staticmethod
+    def _print_more(hidden: int):
+        if hidden > 0:
+            print(f"  ... and {hidden} more (use --top 0 or -v to list all)")
+
+    def _output_filename(self) -> str:
+        return self.output_file or f"btrpa-scan-results.{self.output_format}"
+
+    def _open_output(self):
+        """Open the batch output stream (or its spool) before scanning."""
+        filename = self._output_filename()
+        if filename == "-" or self.output_format == "json":
+            self._out_fh = tempfile.TemporaryFile(buffering=_OUTPUT_BUFFER)
+            self._out_spooled = True
+            if self.output_format == "csv":
+                self._out_csv = csv.writer(io.TextIOWrapper(
+                    self._out_fh, encoding="utf-8", newline="",
+                    write_through=True))
+                self._out_csv.writerow(_FIELDNAMES)
+        elif self.output_format == "csv":
+            self._out_fh = open(filename, "w", newline="",
+                                buffering=_OUTPUT_BUFFER)
+            self._out_csv = csv.writer(self._out_fh)
+            self._out_csv.writerow(_FIELDNAMES)
+        else:
+            self._out_fh = open(filename, "wb", buffering=_OUTPUT_BUFFER)
+
+    def _close_output(self):
+        """Close the batch output stream or spool, if one is open."""
+        if self._out_fh is not None:
+            self._out_fh.close()
+            self._out_fh = None
+            self._out_csv = None
 
     def _write_output(self):
-        """Write batch output file (json / jsonl / csv)."""
-        if not self.output_format or not self.records:
+        """Finish batch output (json / jsonl / csv)."""
+        if not self.output_format or not self.record_count:
+            self._close_output()
             if self.log_file:
                 print(f"  Live log written to {self.log_file}")
             return
 
-        filename = self.output_file or f"btrpa-scan-results.{self.output_format}"
-
-        # Support writing to stdout with --output-file -
-        if filename == "-":
-            if self.output_format == "json":
-                sys.stdout.write(json.dumps(self.records, indent=2) + "\n")
-            elif self.output_format == "jsonl":
-                for record in self.records:
-                    sys.stdout.write(json.dumps(record) + "\n")
-            elif self.output_format == "csv":
-                writer = csv.DictWriter(sys.stdout, fieldnames=_FIELDNAMES)
-                writer.writeheader()
-                writer.writerows(self.records)
-            return
+        filename = self._output_filename()
 
-        if self.output_format == "json":
-            with open(filename, "w") as f:
-                json.dump(self.records, f, indent=2)
-        elif self.output_format == "jsonl":
-            with open(filename, "w") as f:
-                for record in self.records:
-                    f.write(json.dumps(record) + "\n")
-        elif self.output_format == "csv":
-            with open(filename, "w", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=_FIELDNAMES)
-                writer.writeheader()
-                writer.writerows(self.records)
+        try:
+            # Support writing to stdout with --output-file -
+            if filename == "-":
+                sys.stdout.flush()
+                self._write_spooled(sys.stdout.buffer)
+                sys.stdout.buffer.flush()
+                return
+            if self._out_spooled:
+                with open(filename, "wb", buffering=_OUTPUT_BUFFER) as f:
+                    self._write_spooled(f)
+        finally:
+            self._close_output()
         print(f"  Results written to {filename}")
         if self.log_file:
             print(f"  Live log written to {self.log_file}")
 
+    def _write_spooled(self, out):
+        """Copy the spooled records to *out*, a binary stream.
+
+        Records are spooled already formatted, so this is a block copy;
+        JSON only needs its closing bracket.
+        """
+        self._out_fh.seek(0)
+        shutil.copyfileobj(self._out_fh, out, _OUTPUT_BUFFER)
+        if self.output_format == "json":
+            out.write(b"\n]\n")
+
     def stop(self):
         if not self.tui and not self.gui and self.running:
             print("\nStopping scan...")
         self.running = False
 
 
+def _bloom_add(bits: bytearray, key: str) -> bool:
+    """Add *key* to a two-probe Bloom filter.
+
+    Returns True if the key was (probably) already present.  False
+    positives only mean a repeated warning is skipped.
+    """
+    nbits = len(bits) << 3
+    h = hash(key)
+    i = h % nbits
+    j = (h >> 32) % nbits
+    a = bits[i >> 3] & (1 << (i & 7))
+    b = bits[j >> 3] & (1 << (j & 7))
+    if a and b:
+        return True
+    bits[i >> 3] |= 1 << (i & 7)
+    bits[j >> 3] |= 1 << (j & 7)
+    return False
+
+
+if _HAS_ORJSON:
+    def _json_line(obj) -> bytes:
+        """Serialise *obj* as one line of compact UTF-8 JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    def _json_indent(obj) -> bytes:
+        """Serialise *obj* as UTF-8 JSON with a two-space indent."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+
+    class _SOCKETIO_JSON:
+        """json-module stand-in so SocketIO packets are encoded by orjson."""
+
+        @staticmethod
+        def dumps(obj, *args, **kwargs) -> str:
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, *args, **kwargs):
+            return orjson.loads(s)
+else:
+    def _json_line(obj) -> bytes:
+        """Serialise *obj* as one line of compact UTF-8 JSON."""
+        # Same bytes as orjson: compact separators, non-ASCII kept as UTF-8
+        return (json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+                + "\n").encode("utf-8")
+
+    def _json_indent(obj) -> bytes:
+        """Serialise *obj* as UTF-8 JSON with a two-space indent."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+    _json_loads = json.loads
+
+    _SOCKETIO_JSON = json
+
+
+def _encode_bin_address(address: str) -> Tuple[int, bytes]:
+    """Encode an address for the binary log as (kind, bytes).
+
+    Only an upper-case MAC is packed into 6 raw bytes, since that is the
+    form the dumper rebuilds; every other address is kept verbatim.
+    """
+    if _is_mac(address) and address == address.upper():
+        return _BIN_ADDR_MAC, bytes.fromhex(address.translate(_STRIP_SEPS))
+    return _BIN_ADDR_TEXT, address.encode("utf-8")[:255]
+
+
+def _bin_timestamp(timestamp: str) -> Tuple[int, int]:
+    """Split an ISO 8601 record timestamp into (epoch second, UTC offset)."""
+    dt = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S%z")
+    return int(dt.timestamp()), int(dt.utcoffset().total_seconds())
+
+
+def _format_bin_timestamp(epoch: int, offset: int) -> str:
+    """Rebuild the record timestamp exactly as _timestamp() formatted it."""
+    sign = "+" if offset >= 0 else "-"
+    hours, minutes = divmod(abs(offset) // 60, 60)
+    return (time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(epoch + offset))
+            + f"{sign}{hours:02d}{minutes:02d}")
+
+
+def _bin_int(value) -> int:
+    return _BIN_NO_INT if value is None or value == "" else int(value)
+
+
+def _bin_float(value) -> float:
+    return math.nan if value is None or value == "" else float(value)
+
+
+def _pack_bin_record(record: Record, addr: Tuple[int, bytes],
+                     ts: Tuple[int, int]) -> bytes:
+    """Pack one record into the binary live-log layout.
+
+    *addr* comes from _encode_bin_address() and *ts* from _bin_timestamp().
+    """
+    addr_kind, addr_bytes = addr
+    name = (record.name or "").encode("utf-8")[:255]
+    mfr = record.manufacturer_data.encode("utf-8")[:65535]
+    svc = record.service_uuids.encode("utf-8")[:65535]
+    resolved = record.resolved
+    return _BIN_RECORD.pack(
+        ts[0], ts[1], record.rssi, _bin_int(record.avg_rssi),
+        _bin_int(record.tx_power), _bin_float(record.est_distance),
+        _bin_float(record.latitude), _bin_float(record.longitude),
+        _bin_float(record.gps_altitude),
+        2 if resolved == "" or resolved is None else int(resolved),
+        addr_kind, len(addr_bytes), len(name), len(mfr), len(svc),
+    ) + addr_bytes + name + mfr + svc
+
+
+def _iter_bin_records(buf) -> Iterator[dict]:
+    """Yield record dicts (CSV-style values) from a binary live log buffer.
+
+    Raises ValueError if the buffer is not a btrpa-scan binary log.
+    """
+    if buf[:len(_BIN_MAGIC)] != _BIN_MAGIC:
+        raise ValueError("not a btrpa-scan binary log")
+    pos = len(_BIN_MAGIC)
+    end = len(buf)
+    last_ts = None
+    timestamp = ""
+    while pos + _BIN_RECORD.size <= end:
+        (epoch, offset, rssi, avg_rssi, tx_power, dist, lat, lon, alt,
+         resolved, addr_kind, n_addr, n_name, n_mfr,
+         n_svc) = _BIN_RECORD.unpack_from(buf, pos)
+        pos += _BIN_RECORD.size
+        if pos + n_addr + n_name + n_mfr + n_svc > end:
+            break  # truncated tail (scan killed mid-write)
+        addr_bytes = bytes(buf[pos:pos + n_addr])
+        pos += n_addr
+        if addr_kind == _BIN_ADDR_MAC:
+            address = ":".join(f"{b:02X}" for b in addr_bytes)
+        else:
+            address = addr_bytes.decode("utf-8", errors="replace")
+        strings = []
+        for n in (n_name, n_mfr, n_svc):
+            strings.append(bytes(buf[pos:pos + n]).decode("utf-8", errors="ignore"))
+            pos += n
+        if (epoch, offset) != last_ts:
+            last_ts = (epoch, offset)
+            timestamp = _format_bin_timestamp(epoch, offset)
+        yield {
+            "timestamp": timestamp,
+            "address": address,
+            "name": strings[0],
+            "rssi": rssi,
+            "avg_rssi": "" if avg_rssi == _BIN_NO_INT else avg_rssi,
+            "tx_power": "" if tx_power == _BIN_NO_INT else tx_power,
+            "est_distance": "" if math.isnan(dist) else dist,
+            "latitude": "" if math.isnan(lat) else lat,
+            "longitude": "" if math.isnan(lon) else lon,
+            "gps_altitude": "" if math.isnan(alt) else alt,
+            "manufacturer_data": strings[1],
+            "service_uuids": strings[2],
+            "resolved": "" if resolved == 2 else bool(resolved),
+        }
+
+
 def _estimate_distance(rssi: int, tx_power: Optional[int],
                        env: str = "free_space",
-                       ref_rssi: Optional[int] = None) -> Optional[float]:
+                       ref_rssi: Optional[int] = None, *,
+                       _offset: int = _DEFAULT_REF_OFFSET,
+                       _lut: Dict[str, array] = _DIST_LUT,
+                       _loss: Dict[str, float] = _ENV_PATH_LOSS,
+                       ) -> Optional[float]:
     """Estimate distance in meters using the log-distance path loss model.
 
     When *ref_rssi* is provided it is used directly as the expected RSSI at
@@ -2556,17 +3459,29 @@ def _estimate_distance(rssi: int, tx_power: Optional[int],
     ``_DEFAULT_REF_OFFSET`` (59 dB) — the empirically validated offset used
     by the iBeacon standard that accounts for free-space path loss plus
     typical BLE antenna/enclosure losses.
+
+    The keyword-only underscore parameters bind the module tables as
+    locals; callers never pass them.
     """
     if rssi == 0:
         return None
     if ref_rssi is not None:
         measured_power = ref_rssi
     elif tx_power is not None:
-        measured_power = tx_power - _DEFAULT_REF_OFFSET
+        measured_power = tx_power - _offset
     else:
         return None
-    n = _ENV_PATH_LOSS.get(env, 2.0)
-    return 10 ** ((measured_power - rssi) / (10 * n))
+    delta = measured_power - rssi
+    if type(delta) is int and -128 <= delta < 128:
+        table = _lut.get(env)
+        if table is None:
+            table = _lut["free_space"]
+        return table[delta + 128]
+    n = _loss.get(env, 2.0)
+    return 10 ** (delta / (10 * n))
+
+
+_AH_PADDING = b'\x00' * 13  # ah() pads the 3-byte prand to one AES block
 
 
 def _bt_ah(irk: bytes, prand: bytes) -> bytes:
@@ -2578,13 +3493,54 @@ def _bt_ah(irk: bytes, prand: bytes) -> bytes:
     single-block operation.  It is not a vulnerability — only one 16-byte
     block is ever encrypted, so ECB's lack of diffusion is irrelevant.
     """
-    plaintext = b'\x00' * 13 + prand  # 16 bytes: 13 zero-pad + 3-byte prand
-    cipher = Cipher(algorithms.AES(irk), modes.ECB())
-    enc = cipher.encryptor()
-    ct = enc.update(plaintext) + enc.finalize()
+    plaintext = _AH_PADDING + prand  # 16 bytes: 13 zero-pad + 3-byte prand
+    ct = _ecb_update_for(bytes(irk))(plaintext)
     return ct[-3:]  # last 3 bytes = hash
 
 
+def _ecb_encryptor(irk: bytes):
+    """Return a reusable AES-128-ECB encryptor for *irk*.
+
+    ECB carries no state between blocks, so one context can encrypt any
+    number of ah() blocks without being finalized.  OpenSSL expands the key
+    schedule once and uses AES-NI when the CPU supports it.
+    """
+    return Cipher(algorithms.AES(irk), modes.ECB()).encryptor()
+
+
+@functools.lru_cache(maxsize=16)
+def _ecb_update_for(irk: bytes):
+    """Cached update() of an ECB encryptor, so _bt_ah() expands each key once."""
+    return _ecb_encryptor(irk).update
+
+
+def _match_irk(encrypt_fns, prand: bytes, expected_hash: bytes) -> int:
+    """Return the index of the IRK whose ah(prand) equals *expected_hash*.
+
+    *encrypt_fns* are the bound update() methods of per-IRK ECB encryptors.
+    The padded plaintext block is built once and shared by every key.
+    Returns -1 when no IRK matches.
+    """
+    block = _AH_PADDING + prand
+    for i, encrypt in enumerate(encrypt_fns):
+        # endswith() compares the 3-byte hash in place — no slice copy
+        if encrypt(block).endswith(expected_hash):
+            return i
+    return -1
+
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_STRIP_SEPS = str.maketrans("", "", ":-")  # drop MAC/IRK byte separators
+
+
+def _is_mac(address: str) -> bool:
+    """Check for a colon-separated MAC address (AA:BB:CC:DD:EE:FF)."""
+    return (len(address) == 17
+            and address[2::3] == ":::::"
+            and _HEX_DIGITS.issuperset(address[0::3])
+            and _HEX_DIGITS.issuperset(address[1::3]))
+
+
 def _is_rpa(addr_bytes: bytes) -> bool:
     """Check if a 6-byte address is a Resolvable Private Address.
 
@@ -2600,18 +3556,32 @@ def _resolve_rpa(irk: bytes, address: str) -> bool:
     prand = first 3 octets (AA:BB:CC), hash = last 3 octets (DD:EE:FF).
     Returns True if ah(IRK, prand) == hash.
     """
-    parts = address.replace("-", ":").split(":")
-    if len(parts) != 6:
+    parts = _rpa_parts(address)
+    if parts is None:
         return False
+    return _match_irk((_ecb_update_for(bytes(irk)),), *parts) == 0
+
+
+def _rpa_parts(address: str) -> Optional[Tuple[bytes, bytes]]:
+    """Split a MAC address string into (prand, hash).
+
+    Returns None if the string is not a well-formed Resolvable Private
+    Address.
+    """
+    # Separators at every third position, then let fromhex() check digits
+    if len(address) != 17 or address[2::3].strip(":-"):
+        return None
+    # RPA top bits are 0b01, i.e. the first hex digit is 4-7; this rejects
+    # public/static addresses before anything is decoded
+    if address[0] not in "4567":
+        return None
     try:
-        addr_bytes = bytes(int(b, 16) for b in parts)
+        addr_bytes = bytes.fromhex(address.translate(_STRIP_SEPS))
     except ValueError:
-        return False
-    if not _is_rpa(addr_bytes):
-        return False
-    prand = addr_bytes[:3]
-    expected_hash = addr_bytes[3:]
-    return _bt_ah(irk, prand) == expected_hash
+        return None
+    if len(addr_bytes) != 6:
+        return None
+    return addr_bytes[:3], addr_bytes[3:]
 
 
 def _parse_irk(irk_string: str) -> bytes:
@@ -2620,9 +3590,9 @@ def _parse_irk(irk_string: str) -> bytes:
     Returns 16 bytes or raises ValueError.
     """
     s = irk_string.strip()
-    if s.lower().startswith("0x"):
+    if s[:2] in ("0x", "0X"):
         s = s[2:]
-    s = s.replace(":", "").replace("-", "")
+    s = s.translate(_STRIP_SEPS)
     if len(s) != 32:
         raise ValueError(
             f"IRK must be exactly 16 bytes (32 hex chars), got {len(s)} hex chars")
@@ -2632,6 +3602,8 @@ def _parse_irk(irk_string: str) -> bytes:
         raise ValueError(f"IRK contains invalid hex characters: {irk_string}")
 
 
+# Used for the command-line MAC argument; code paths that run per
+# advertisement use _is_mac() instead of the regex engine
 _MAC_RE = re.compile(r"^[0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5}$")
 
 
@@ -2675,6 +3647,12 @@ def main():
         "--log", type=str, default=None, metavar="FILE",
         help="Stream detections to a CSV file in real time"
     )
+    parser.add_argument(
+        "--log-format", choices=["csv", "binary"], default="csv",
+        help="Format of the --log file: csv (default) or binary — a "
+             "compact packed format for long sessions, convert with "
+             "btrpa-dump"
+    )
 
     # Verbosity
     verbosity = parser.add_mutually_exclusive_group()
@@ -2692,6 +3670,11 @@ def main():
         "--min-rssi", type=int, default=None, metavar="DBM",
         help="Minimum RSSI threshold (e.g. -70) — ignore weaker signals"
     )
+    parser.add_argument(
+        "--top", type=int, default=_SUMMARY_TOP, metavar="N",
+        help=f"Devices listed in the end-of-scan summary "
+             f"(default: {_SUMMARY_TOP}; 0 = all)"
+    )
     parser.add_argument(
         "--rssi-window", type=int, default=1, metavar="N",
         help="RSSI sliding window size for averaging (e.g. 5-10). "
@@ -2770,6 +3753,9 @@ def main():
         parser.error("--output-file (-o) requires --output to specify "
                      "the format (csv, json, or jsonl)")
 
+    if args.log_format != "csv" and not args.log:
+        parser.error("--log-format requires --log")
+
     if args.mac and not _MAC_RE.match(args.mac):
         parser.error(
             f"Invalid MAC address '{args.mac}'. "
@@ -2792,6 +3778,9 @@ def main():
     if args.rssi_window < 1:
         parser.error("--rssi-window must be at least 1")
 
+    if args.top < 0:
+        parser.error("--top must be 0 or more")
+
     if args.tui and not _HAS_CURSES:
         parser.error("--tui requires the 'curses' module "
                      "(install 'windows-curses' on Windows)")
@@ -2801,7 +3790,7 @@ def main():
 
     if args.gui and not _HAS_FLASK:
         parser.error("--gui requires Flask and flask-socketio. "
-                     "Install with: pip install flask flask-socketio")
+                     "Install with: pip install flask flask-socketio simple-websocket")
 
     if args.gui and args.tui:
         parser.error("Cannot use --gui with --tui")
@@ -2875,15 +3864,54 @@ def main():
         name_filter=args.name_filter,
         gui=args.gui,
         gui_port=args.gui_port,
+        log_format=args.log_format,
+        top=args.top,
     )
 
+    # uvloop (the [fast] extra, not on Windows) dispatches the per-
+    # advertisement callbacks with less overhead than the stock loop
+    run = uvloop.run if _HAS_UVLOOP else asyncio.run
     try:
-        asyncio.run(scanner.scan())
+        run(scanner.scan())
     except KeyboardInterrupt:
         # Ensure stop() is called so cleanup (summary, output, GUI shutdown)
         # runs properly — covers Windows where add_signal_handler is unavailable.
         scanner.stop()
 
 
+def dump_main():
+    """Convert a binary live log (--log-format binary) to CSV."""
+    parser = argparse.ArgumentParser(
+        description="Convert a btrpa-scan binary log to CSV"
+    )
+    parser.add_argument("file", help="Binary log written with --log-format binary")
+    parser.add_argument(
+        "-o", "--output-file", type=str, default="-", metavar="FILE",
+        help="CSV output path (default: - for stdout)"
+    )
+    args = parser.parse_args()
+
+    try:
+        with open(args.file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                parser.error(f"{args.file}: not a btrpa-scan binary log")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                if args.output_file == "-":
+                    out = sys.stdout
+                else:
+                    out = open(args.output_file, "w", newline="")
+                try:
+                    writer = csv.DictWriter(out, fieldnames=_FIELDNAMES)
+                    writer.writeheader()
+                    writer.writerows(_iter_bin_records(buf))
+                finally:
+                    if out is not sys.stdout:
+                        out.close()
+    except OSError as e:
+        parser.error(f"Cannot read log file: {e}")
+    except ValueError as e:
+        parser.error(f"{args.file}: {e}")
+
+
 if __name__ == "__main__":
     main()
@@ -4,10 +4,16 @@
 Run with:  python -m pytest test_btrpa_scan.py -v
 """
 
+import asyncio
+import csv
 import importlib
+import json
 import re
 import struct
+import threading
+import time
 from collections import deque
+from types import SimpleNamespace
 
 import pytest
 
@@ -34,6 +40,10 @@ class TestParseIrk:
         raw = "0x0123456789abcdef0123456789abcdef"
         assert btrpa._parse_irk(raw) == bytes.fromhex(raw[2:])
 
+    def test_upper_0x_prefix(self):
+        raw = "0X0123456789abcdef0123456789abcdef"
+        assert btrpa._parse_irk(raw) == bytes.fromhex(raw[2:])
+
     def test_colon_separated(self):
         raw = "01:23:45:67:89:AB:CD:EF:01:23:45:67:89:AB:CD:EF"
         expected = bytes.fromhex(raw.replace(":", ""))
@@ -159,6 +169,42 @@ class TestBtAh:
         r2 = btrpa._bt_ah(irk, prand)
         assert r1 == r2
 
+    def test_ecb_encryptor_matches_ah(self):
+        irk = bytes.fromhex("0123456789abcdef0123456789abcdef")
+        enc = btrpa._ecb_encryptor(irk)
+        for prand in (bytes([0x55, 0xAA, 0x33]), bytes([0x40, 0x00, 0x01])):
+            # Context is reused across blocks without finalize()
+            ct = enc.update(btrpa._AH_PADDING + prand)
+            assert ct[13:] == btrpa._bt_ah(irk, prand)
+
+    def test_key_schedule_cached(self):
+        irk = bytes.fromhex("00112233445566778899aabbccddeeff")
+        btrpa._bt_ah(irk, b"\x40\x00\x01")
+        before = btrpa._ecb_update_for.cache_info().hits
+        btrpa._bt_ah(bytearray(irk), b"\x40\x00\x02")
+        assert btrpa._ecb_update_for.cache_info().hits == before + 1
+
+    def test_match_irk_returns_index(self):
+        irks = [bytes.fromhex("fedcba9876543210fedcba9876543210"),
+                bytes.fromhex("0123456789abcdef0123456789abcdef")]
+        fns = [btrpa._ecb_encryptor(k).update for k in irks]
+        prand = bytes([0x55, 0xAA, 0x33])
+        assert btrpa._match_irk(fns, prand, btrpa._bt_ah(irks[1], prand)) == 1
+        assert btrpa._match_irk([], prand, b"\x00\x00\x00") == -1
+
+    def test_rpa_parts(self):
+        assert btrpa._rpa_parts("55:AA:33:01:02:03") == (
+            bytes([0x55, 0xAA, 0x33]), bytes([0x01, 0x02, 0x03]))
+        assert btrpa._rpa_parts("00:11:22:33:44:55") is None
+        assert btrpa._rpa_parts("not-a-mac") is None
+
+    def test_is_mac(self):
+        assert btrpa._is_mac("AA:bb:0C:dd:EE:ff")
+        for bad in ("", "AA:BB:CC:DD:EE", "AA:BB:CC:DD:EE:FG",
+                    "AA-BB-CC-DD-EE-FF", "AABB:CC:DD:EE:FF:", "AA:BB:CC:DD:EE:FF:"):
+            assert not btrpa._is_mac(bad)
+            assert btrpa._MAC_RE.match(bad) is None
+
 
 # ------------------------------------------------------------------
 # _estimate_distance
@@ -206,6 +252,14 @@ class TestEstimateDistance:
         assert d_free is not None and d_indoor is not None
         assert d_indoor < d_free
 
+    def test_table_matches_formula(self):
+        for env, n in btrpa._ENV_PATH_LOSS.items():
+            for rssi in (-127, -90, -59, -1):
+                expected = 10 ** ((-59 - rssi) / (10 * n))
+                assert btrpa._estimate_distance(rssi, 0, env) == expected
+        # Outside the table range falls back to the formula
+        assert btrpa._estimate_distance(-200, 0) == 10 ** (141 / 20)
+
     def test_unknown_env_defaults_to_2(self):
         d1 = btrpa._estimate_distance(-60, tx_power=0, env="free_space")
         d2 = btrpa._estimate_distance(-60, tx_power=0, env="nonexistent")
@@ -229,6 +283,14 @@ class TestTimestamp:
     def test_not_empty(self):
         assert len(btrpa._timestamp()) > 0
 
+    def test_cached_within_second(self, monkeypatch):
+        monkeypatch.setattr(btrpa.time, "time", lambda: 1700000000.25)
+        first = btrpa._timestamp()
+        monkeypatch.setattr(btrpa.time, "time", lambda: 1700000000.75)
+        assert btrpa._timestamp() is first
+        monkeypatch.setattr(btrpa.time, "time", lambda: 1700000001.0)
+        assert btrpa._timestamp() != first
+
 
 # ------------------------------------------------------------------
 # _mask_irk
@@ -252,6 +314,55 @@ class TestMaskIrk:
         assert btrpa._mask_irk("ab") == "ab"
 
 
+# ------------------------------------------------------------------
+# GpsdReader line handling
+# ------------------------------------------------------------------
+
+class TestGpsdLine:
+    """Tests for GpsdReader._handle_line — gpsd JSON → stored fix."""
+
+    def test_tpv_sets_fix(self):
+        g = btrpa.GpsdReader()
+        assert g._handle_line(
+            b'{"class":"TPV","lat":1.5,"lon":2.5,"alt":3.0}\n') is True
+        assert g.fix == (1.5, 2.5, 3.0)
+
+    def test_ignores_other_classes_and_garbage(self):
+        g = btrpa.GpsdReader()
+        g._handle_line(b'{"class":"SKY","satellites":[]}\n')
+        g._handle_line(b'not json\n')
+        g._handle_line(b'{"class":"TPV","lat":\xff,"lon":1}\n')
+        g._handle_line(b'\n')
+        assert g.fix is None
+
+    def test_tpv_without_position_ignored(self):
+        g = btrpa.GpsdReader()
+        assert g._handle_line(b'{"class":"TPV","mode":1}\n') is False
+        assert g.fix is None
+
+    def test_stop_wakes_reconnect_wait(self):
+        # Nothing listens on port 1, so the thread sits in its reconnect
+        # delay — stop() must not have to wait that out
+        g = btrpa.GpsdReader(port=1)
+        g.start()
+        time.sleep(0.1)
+        g.stop()
+        assert not g._thread.is_alive()
+
+    def test_reader_thread_closes_wake_sockets(self):
+        g = btrpa.GpsdReader(port=1)
+        g.start()
+        wake_r, wake_w = g._wake_r, g._wake_w
+        thread = g._thread
+        # stop() gives up on join() while the reader is still alive; the
+        # pair must stay usable until the reader itself exits
+        thread.join = lambda timeout=None: None
+        g.stop()
+        threading.Thread.join(thread, 2)
+        assert not thread.is_alive()
+        assert wake_r.fileno() == -1 and wake_w.fileno() == -1
+
+
 # ------------------------------------------------------------------
 # BLEScanner._avg_rssi (via instance)
 # ------------------------------------------------------------------
@@ -290,6 +401,15 @@ class TestAvgRssi:
         assert s._avg_rssi("DEV1", -40) == -40
         assert s._avg_rssi("DEV2", -80) == -80
 
+    def test_long_run_matches_naive_window(self):
+        s = self._make_scanner(window=4)
+        window = deque(maxlen=4)
+        for rssi in (-40, -90, -55, -71, -62, -80, -33, -100, -47):
+            window.append(rssi)
+            assert s._avg_rssi("AA:BB", rssi) == round(sum(window) / len(window))
+        assert s._rssi_samples("AA:BB") == 4
+        assert s._rssi_samples("CC:DD") == 0
+
     def test_window_minimum_1(self):
         s = btrpa.BLEScanner(
             target_mac=None, timeout=10, rssi_window=0, gps=False)
@@ -319,3 +439,525 @@ class TestGuiParameter:
     def test_gui_port_custom(self):
         s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False, gui=True, gui_port=8080)
         assert s.gui_port == 8080
+
+    def test_gps_only_emitted_when_fix_changes(self):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             gui=True)
+        sent = []
+        s._gui_server = SimpleNamespace(emit_status=lambda status: None,
+                                        emit_gps=sent.append)
+        s._gps = SimpleNamespace(fix=(51.5, -0.12, None))
+        s._poll_tick(time.time())
+        s._poll_tick(time.time())
+        s._gps.fix = (51.6, -0.12, None)
+        s._poll_tick(time.time())
+        assert [g["lat"] for g in sent] == [51.5, 51.6]
+
+    def test_status_only_emitted_when_it_changes(self):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             gui=True)
+        sent = []
+        s._gui_server = SimpleNamespace(emit_status=sent.append)
+        start = time.time()
+        s._poll_tick(start)
+        s._poll_tick(start)
+        s.seen_count += 1
+        s._poll_tick(start)
+        assert [st["total_detections"] for st in sent] == [0, 1]
+
+    def test_device_delta_sends_changed_fields(self):
+        prev = {"address": "AA", "name": "Tag", "rssi": -60, "best_gps": None}
+        data = {"address": "AA", "name": "Tag", "rssi": -55, "best_gps": None}
+        assert btrpa._device_delta(prev, data) == {"address": "AA",
+                                                   "rssi": -55}
+        assert btrpa._device_delta(data, data) == {"address": "AA"}
+
+    def test_json_line_is_compact_utf8(self):
+        # Identical bytes whether or not orjson is installed
+        assert btrpa._json_line({"name": "Caf\u00e9", "rssi": -60}) == (
+            '{"name":"Caf\u00e9","rssi":-60}\n'.encode("utf-8"))
+
+    def test_socketio_json_round_trip(self):
+        payload = {"address": "AA", "est_distance": 1.5, "best_gps": None}
+        text = btrpa._SOCKETIO_JSON.dumps(payload, separators=(",", ":"))
+        assert isinstance(text, str)
+        assert btrpa._SOCKETIO_JSON.loads(text) == payload
+
+
+# ------------------------------------------------------------------
+# BLEScanner detection callback
+# ------------------------------------------------------------------
+
+def _fake_adv(address="AA:BB:CC:DD:EE:FF", name=None, rssi=-60,
+              tx_power=None):
+    device = SimpleNamespace(address=address, name=name)
+    adv = SimpleNamespace(rssi=rssi, tx_power=tx_power, local_name=name,
+                          manufacturer_data={}, service_uuids=[],
+                          service_data={}, platform_data=())
+    return device, adv
+
+
+class TestDetectionCallback:
+    """Tests for filtering and counting in the detection callback."""
+
+    def _make_scanner(self, **kwargs):
+        return btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                                quiet=True, **kwargs)
+
+    def test_counts_unique_devices(self):
+        s = self._make_scanner()
+        s.detection_callback(*_fake_adv("aa:bb:cc:dd:ee:ff"))
+        s.detection_callback(*_fake_adv("AA:BB:CC:DD:EE:FF"))
+        assert s.seen_count == 2
+        assert s.unique_devices == {"AA:BB:CC:DD:EE:FF": 2}
+
+    def test_unfiltered_callback_matches_generic(self):
+        fast = self._make_scanner()
+        generic = self._make_scanner(min_rssi=-200)
+        assert fast._detection_callback_inner == fast._detect_unfiltered
+        assert generic._detection_callback_inner != generic._detect_unfiltered
+        for addr in ("aa:bb:cc:dd:ee:ff", "11:22:33:44:55:66",
+                     "AA:BB:CC:DD:EE:FF"):
+            fast.detection_callback(*_fake_adv(addr))
+            generic.detection_callback(*_fake_adv(addr))
+        assert fast.unique_devices == generic.unique_devices
+        assert fast.seen_count == generic.seen_count == 3
+
+    def test_other_thread_detections_run_on_loop(self):
+        s = self._make_scanner()
+        handled_on = []
+        inner = s._detection_callback_inner
+
+        def record_thread(device, adv):
+            handled_on.append(threading.get_ident())
+            inner(device, adv)
+        s._detection_callback_inner = record_thread
+
+        async def run():
+            s._loop = asyncio.get_running_loop()
+            s._loop_thread = threading.get_ident()
+            t = threading.Thread(target=lambda: [
+                s.detection_callback(*_fake_adv()) for _ in range(50)])
+            t.start()
+            t.join()
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        assert s.seen_count == 50
+        assert set(handled_on) == {threading.get_ident()}
+
+    def test_distance_memoized(self):
+        s = self._make_scanner()
+        rec1 = s._build_record(*_fake_adv(rssi=-70, tx_power=-59))
+        rec2 = s._build_record(*_fake_adv("11:22:33:44:55:66",
+                                          rssi=-70, tx_power=-59))
+        expected = round(btrpa._estimate_distance(-70, -59), 2)
+        assert rec1.est_distance == rec2.est_distance == expected
+        assert s._build_record(*_fake_adv(rssi=-70)).est_distance == ""
+        assert len(s._dist_cache) == 2
+
+    def test_addr_key_is_shared(self):
+        s = self._make_scanner()
+        key = s._addr_key("aa:bb:cc:dd:ee:ff")
+        assert key == "AA:BB:CC:DD:EE:FF"
+        assert s._addr_key("aa:bb:cc:dd:ee:ff") is key
+        assert s._addr_key(None) == ""
+
+    def test_name_filter_case_insensitive(self):
+        s = self._make_scanner(name_filter="iPhone")
+        s.detection_callback(*_fake_adv(name="Dave's IPHONE"))
+        s.detection_callback(*_fake_adv("11:22:33:44:55:66", name="Watch"))
+        s.detection_callback(*_fake_adv("11:22:33:44:55:77", name=None))
+        assert list(s.unique_devices) == ["AA:BB:CC:DD:EE:FF"]
+
+    def test_min_rssi(self):
+        s = self._make_scanner(min_rssi=-70)
+        s.detection_callback(*_fake_adv(rssi=-80))
+        assert s.seen_count == 0
+        s.detection_callback(*_fake_adv(rssi=-65))
+        assert s.seen_count == 1
+
+    def test_manufacturer_data_format(self):
+        s = self._make_scanner()
+        device, adv = _fake_adv()
+        adv.manufacturer_data = {0x004C: b"\x02\x15", 6: b""}
+        adv.service_uuids = ["180f", "180a"]
+        for _ in range(2):  # second pass uses the cached prefixes
+            rec = s._build_record(device, adv)
+            # Formatted on first read, not when the record is built
+            assert rec._mfr is adv.manufacturer_data
+            assert rec.manufacturer_data == "0x004C:0215; 0x0006:"
+            assert rec.service_uuids == "180f, 180a"
+
+    def test_uuid_warned_once_in_irk_mode(self, capsys):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             irks=[bytes(16)])
+        uuid = "12345678-1234-1234-1234-123456789ABC"
+        for _ in range(3):
+            s.detection_callback(*_fake_adv(uuid))
+        assert capsys.readouterr().out.count("cannot resolve") == 1
+        assert s.seen_count == 3
+
+    def test_uuid_bloom_false_positive_still_warns(self, capsys, monkeypatch):
+        # A one-byte filter saturates at once, so every UUID after the
+        # first is a Bloom hit and must be confirmed before it is skipped
+        monkeypatch.setattr(btrpa, "_WARN_BLOOM_BYTES", 1)
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             irks=[bytes(16)])
+        uuids = [f"12345678-1234-1234-1234-12345678{i:04X}" for i in range(20)]
+        for uuid in uuids + uuids:
+            s.detection_callback(*_fake_adv(uuid))
+        assert capsys.readouterr().out.count("cannot resolve") == 20
+
+    def test_uuid_warned_once_past_recent_limit(self, capsys, monkeypatch):
+        monkeypatch.setattr(btrpa, "_WARN_RECENT_MAX", 4)
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             irks=[bytes(16)])
+        uuids = [f"12345678-1234-1234-1234-12345678{i:04X}" for i in range(10)]
+        for uuid in uuids * 3:
+            s.detection_callback(*_fake_adv(uuid))
+        assert capsys.readouterr().out.count("cannot resolve") == 10
+
+    def test_irk_result_cached_per_address(self):
+        irk = bytes.fromhex("0123456789abcdef0123456789abcdef")
+        prand = bytes([0x55, 0xAA, 0x33])
+        rpa = ":".join(f"{b:02X}" for b in prand + btrpa._bt_ah(irk, prand))
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, irks=[irk])
+        calls = []
+        encrypt = s._irk_encrypt[0]
+        s._irk_encrypt = (lambda block: calls.append(block) or encrypt(block),)
+        for _ in range(3):
+            s.detection_callback(*_fake_adv(rpa))
+        assert len(calls) == 1
+        assert s.resolved_devices == {rpa: 3}
+
+    def test_irk_result_cache_bounded(self, monkeypatch):
+        monkeypatch.setattr(btrpa, "_IRK_CACHE_MAX", 2)
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, irks=[bytes(16)])
+        for addr in ("40:00:00:00:00:01", "40:00:00:00:00:02",
+                     "40:00:00:00:00:03"):
+            s.detection_callback(*_fake_adv(addr))
+        assert list(s._irk_results) == ["40:00:00:00:00:02",
+                                        "40:00:00:00:00:03"]
+
+    def test_addr_key_cache_bounded(self, monkeypatch):
+        monkeypatch.setattr(btrpa, "_IRK_CACHE_MAX", 2)
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True)
+        for addr in ("aa:00:00:00:00:01", "aa:00:00:00:00:02",
+                     "aa:00:00:00:00:03"):
+            s.detection_callback(*_fake_adv(addr))
+        assert list(s._addr_upper) == ["aa:00:00:00:00:02",
+                                       "aa:00:00:00:00:03"]
+        assert s.unique_devices["AA:00:00:00:00:01"] == 1
+
+    def test_bloom_add(self):
+        bits = bytearray(64)
+        assert btrpa._bloom_add(bits, "a") is False
+        assert btrpa._bloom_add(bits, "a") is True
+
+    def test_targeted_skips_other_devices_early(self):
+        s = btrpa.BLEScanner(target_mac="AA:BB:CC:DD:EE:FF", timeout=10,
+                             gps=False, quiet=True, rssi_window=3)
+        s.detection_callback(*_fake_adv("11:22:33:44:55:66"))
+        s.detection_callback(*_fake_adv("aa:bb:cc:dd:ee:ff", rssi=-50))
+        assert s.seen_count == 1
+        # No RSSI window is kept for devices that can never be reported
+        assert list(s._rssi_ids) == ["AA:BB:CC:DD:EE:FF"]
+
+
+# ------------------------------------------------------------------
+# TUI redraw gating
+# ------------------------------------------------------------------
+
+class _FakeScreen:
+    def __init__(self):
+        self.draws = 0
+        self.lines = []
+
+    def erase(self):
+        self.draws += 1
+        self.lines = []
+
+    def getmaxyx(self):
+        return (24, 100)
+
+    def addnstr(self, y, x, text, *args):
+        self.lines.append(text)
+
+    def refresh(self):
+        pass
+
+
+@pytest.mark.skipif(not btrpa._HAS_CURSES, reason="curses not available")
+class TestTuiRedraw:
+    """Tests for skipping TUI redraws when nothing changed."""
+
+    def test_redraw_only_when_dirty_or_second_ticks(self, monkeypatch):
+        monkeypatch.setattr(btrpa.time, "time", lambda: 1000.2)
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             tui=True)
+        s._tui_start = 1000.0
+        s._tui_screen = screen = _FakeScreen()
+        s._poll_tick(1000.0)
+        s._poll_tick(1000.0)
+        assert screen.draws == 1
+        s.detection_callback(*_fake_adv())
+        s._poll_tick(1000.0)
+        assert screen.draws == 2
+        monkeypatch.setattr(btrpa.time, "time", lambda: 1001.1)
+        s._poll_tick(1000.0)
+        assert screen.draws == 3
+
+    def test_device_entry_updated_in_place(self):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             tui=True)
+        s.detection_callback(*_fake_adv(rssi=-70))
+        dev = s.tui_devices["AA:BB:CC:DD:EE:FF"]
+        s.detection_callback(*_fake_adv(rssi=-40))
+        assert s.tui_devices["AA:BB:CC:DD:EE:FF"] is dev
+        assert (dev.rssi, dev.times_seen) == (-40, 2)
+        s._tui_start = time.time()
+        screen = _FakeScreen()
+        s._redraw_tui(screen)
+        row = next(l for l in screen.lines if l.startswith(" AA:BB"))
+        assert "-40" in row and "2x" in row
+        assert time.strftime("%H:%M:%S",
+                             time.localtime(dev.last_seen)) in row
+
+
+# ------------------------------------------------------------------
+# Records and batch export
+# ------------------------------------------------------------------
+
+class TestRecord:
+    """Tests for Record objects and spooled batch export."""
+
+    def test_as_dict_field_order(self):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True)
+        rec = s._build_record(*_fake_adv(rssi=-55))
+        d = rec.as_dict()
+        assert list(d) == btrpa._FIELDNAMES
+        assert d["rssi"] == -55
+        assert d["tx_power"] == ""
+        assert not hasattr(rec, "__dict__")
+
+    @pytest.mark.parametrize("fmt", ["csv", "json", "jsonl"])
+    def test_write_output_stdout(self, capsysbinary, fmt):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, output_format=fmt, output_file="-")
+        s._open_output()
+        s.detection_callback(*_fake_adv(name="Caf\u00e9", rssi=-61))
+        s._write_output()
+        text = capsysbinary.readouterr().out.decode("utf-8")
+        if fmt == "csv":
+            rows = list(csv.DictReader(text.splitlines()))
+        elif fmt == "json":
+            rows = json.loads(text)
+        else:
+            rows = [json.loads(line) for line in text.splitlines()]
+        assert len(rows) == 1
+        assert rows[0]["name"] == "Caf\u00e9"
+
+    @pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+    def test_rows_written_during_scan(self, tmp_path, fmt):
+        path = tmp_path / f"out.{fmt}"
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, output_format=fmt,
+                             output_file=str(path))
+        s._open_output()
+        s.detection_callback(*_fake_adv(rssi=-61))
+        s._out_fh.flush()
+        assert "AA:BB:CC:DD:EE:FF" in path.read_text()
+        assert s.record_count == 1
+        s._close_output()
+
+    def test_bad_output_path_fails_before_scanning(self, tmp_path):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, output_format="csv",
+                             output_file=str(tmp_path / "missing" / "out.csv"))
+
+        async def scan_loop():
+            raise AssertionError("scan started")
+        s._scan_loop = scan_loop
+        with pytest.raises(FileNotFoundError):
+            asyncio.run(s.scan())
+
+    @pytest.mark.parametrize("fmt", ["csv", "json", "jsonl"])
+    def test_output_closed_when_scan_fails(self, tmp_path, fmt):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, output_format=fmt,
+                             output_file=str(tmp_path / f"out.{fmt}"))
+
+        async def scan_loop():
+            raise RuntimeError("adapter gone")
+        s._scan_loop = scan_loop
+        with pytest.raises(RuntimeError):
+            asyncio.run(s.scan())
+        assert s._out_fh is None
+
+    @pytest.mark.parametrize("fmt", ["csv", "json", "jsonl"])
+    def test_write_output(self, tmp_path, fmt):
+        path = tmp_path / f"out.{fmt}"
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, output_format=fmt,
+                             output_file=str(path))
+        s._open_output()
+        s.detection_callback(*_fake_adv(rssi=-61))
+        s.detection_callback(*_fake_adv("11:22:33:44:55:66", rssi=-62))
+        s._write_output()
+        text = path.read_text()
+        if fmt == "csv":
+            rows = list(csv.DictReader(text.splitlines()))
+            assert [r["rssi"] for r in rows] == ["-61", "-62"]
+        elif fmt == "json":
+            rows = json.loads(text)
+            assert [r["address"] for r in rows] == [
+                "AA:BB:CC:DD:EE:FF", "11:22:33:44:55:66"]
+            # Streamed output keeps the json.dump(indent=2) layout
+            assert text == json.dumps(rows, indent=2) + "\n"
+        else:
+            rows = [json.loads(line) for line in text.splitlines()]
+            assert list(rows[0]) == btrpa._FIELDNAMES
+
+
+# ------------------------------------------------------------------
+# Summary
+# ------------------------------------------------------------------
+
+class TestSummary:
+    """Tests for the end-of-scan summary tables."""
+
+    def test_top_counts_limits_rows(self):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False, top=2)
+        counts = {"A": 1, "B": 5, "C": 3, "D": 5}
+        assert s._top_counts(counts) == [("B", 5), ("D", 5)]
+        s.top = 0
+        assert [a for a, _ in s._top_counts(counts)] == ["B", "D", "C", "A"]
+
+    def test_summary_reports_hidden(self, capsys):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, top=1)
+        s.detection_callback(*_fake_adv("11:22:33:44:55:66"))
+        s.detection_callback(*_fake_adv())
+        s.detection_callback(*_fake_adv())
+        s._print_summary(1.0)
+        out = capsys.readouterr().out
+        assert "AA:BB:CC:DD:EE:FF" in out
+        assert "11:22:33:44:55:66" not in out
+        assert "... and 1 more" in out
+
+    def test_gps_column_follows_first_fix(self, capsys):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True)
+        s.detection_callback(*_fake_adv())
+        assert not s._any_gps_seen
+        s._gps = SimpleNamespace(fix=(51.5, -0.12, None))
+        s.detection_callback(*_fake_adv("11:22:33:44:55:66"))
+        assert s._any_gps_seen
+        s._print_summary(1.0)
+        out = capsys.readouterr().out
+        assert "Best GPS" in out
+        assert "51.500000, -0.120000" in out
+
+
+# ------------------------------------------------------------------
+# Real-time CSV log
+# ------------------------------------------------------------------
+
+class TestLiveLog:
+    """Tests for batched live-log writing."""
+
+    def _open_log(self, s, path):
+        s._log_fh = open(path, "w", newline="")
+        s._log_writer = csv.writer(s._log_fh)
+        s._log_writer.writerow(btrpa._FIELDNAMES)
+        s._flush_log()
+
+    def test_rows_batched_then_flushed(self, tmp_path):
+        path = tmp_path / "live.csv"
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True)
+        self._open_log(s, path)
+        s.detection_callback(*_fake_adv(rssi=-61))
+        s.detection_callback(*_fake_adv(rssi=-62))
+        # Still buffered in memory — within the flush interval
+        assert len(s._log_batch) == 2
+        s._flush_log()
+        s._log_fh.close()
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [r["rssi"] for r in rows] == ["-61", "-62"]
+        assert rows[0]["address"] == "AA:BB:CC:DD:EE:FF"
+        assert list(rows[0]) == btrpa._FIELDNAMES
+
+    def test_batch_size_triggers_write(self, tmp_path):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True)
+        self._open_log(s, tmp_path / "live.csv")
+        for _ in range(btrpa._LOG_BATCH_ROWS):
+            s.detection_callback(*_fake_adv())
+        assert s._log_batch == []
+        s._log_fh.close()
+
+    def test_binary_log_round_trip(self, tmp_path):
+        path = tmp_path / "live.bin"
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, log_format="binary")
+        s._log_fh = open(path, "wb")
+        s._log_writer = s._log_fh
+        s._log_fh.write(btrpa._BIN_MAGIC)
+        s.detection_callback(*_fake_adv(rssi=-61, tx_power=-59))
+        s.detection_callback(*_fake_adv(address="uuid-like-address",
+                                        name="Caf\u00e9", rssi=-70))
+        s._flush_log()
+        s._log_fh.close()
+        rows = list(btrpa._iter_bin_records(path.read_bytes()))
+        assert [r["rssi"] for r in rows] == [-61, -70]
+        assert rows[0]["address"] == "AA:BB:CC:DD:EE:FF"
+        assert rows[0]["tx_power"] == -59
+        assert rows[0]["latitude"] == ""
+        assert rows[0]["resolved"] == ""
+        assert rows[1]["address"] == "uuid-like-address"
+        assert rows[1]["name"] == "Caf\u00e9"
+        assert rows[1]["tx_power"] == ""
+        assert list(rows[0]) == btrpa._FIELDNAMES
+        # MAC stored as 6 raw bytes
+        assert btrpa._encode_bin_address("AA:BB:CC:DD:EE:FF") == (
+            btrpa._BIN_ADDR_MAC, bytes.fromhex("AABBCCDDEEFF"))
+
+    @pytest.mark.parametrize("address", [
+        "aa:bb:cc:dd:ee:ff", "123456", "1a2b3c4d-0000-1000-8000-00805f9b34fb"])
+    def test_binary_log_keeps_address_text(self, address):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, log_format="binary")
+        record = s._build_record(*_fake_adv(address=address))
+        buf = btrpa._BIN_MAGIC + s._binary_row(record)
+        assert next(btrpa._iter_bin_records(buf))["address"] == address
+
+    def test_binary_log_keeps_distance_precision(self):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, log_format="binary")
+        record = s._build_record(*_fake_adv())
+        record.est_distance = 12.3  # not exact in float32
+        buf = btrpa._BIN_MAGIC + s._binary_row(record)
+        row = next(btrpa._iter_bin_records(buf))
+        assert str(row["est_distance"]) == "12.3"
+
+    @pytest.mark.parametrize("timestamp", [
+        "2024-03-01T12:34:56+0000", "2024-03-01T12:34:56+0530",
+        "2023-12-31T23:59:59-0330"])
+    def test_binary_log_keeps_record_timestamp(self, timestamp):
+        s = btrpa.BLEScanner(target_mac=None, timeout=10, gps=False,
+                             quiet=True, log_format="binary")
+        record = s._build_record(*_fake_adv())
+        record.timestamp = timestamp
+        buf = btrpa._BIN_MAGIC + s._binary_row(record)
+        assert next(btrpa._iter_bin_records(buf))["timestamp"] == timestamp
+
+    def test_binary_log_rejects_other_files(self):
+        with pytest.raises(ValueError):
+            list(btrpa._iter_bin_records(b"timestamp,address\n"))